@@ -0,0 +1,43 @@
+import asyncio
+from typing import AsyncIterator
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from config import Settings, get_settings
+from todo_events import event_adapter, get_broker
+from schema.response import UserSchema
+from security import get_stream_user
+
+# 동시 실행 제한(ConcurrencyLimit)이 걸린 todo router와 분리: 스트림은 연결 내내 슬롯을 차지하므로
+router = APIRouter(prefix="/todos")
+
+
+# 유저별 todo 변경 스트림 (Server-Sent Events)
+# GET /todos를 주기적으로 polling 하는 대신 연결을 유지하고 변경이 있을 때만 전송 받음
+#   event: created | updated | deleted | resync
+#   data: {"type": ..., "user_id": ..., "id": ..., "todo": {...}, "seq": ..., "was_done": ...}
+# resync를 받거나 재연결하면 마지막으로 받은 seq로 GET /todos/changes?since=seq 조회 (밀린 이벤트 유실, redis 재연결)
+@router.get("/events")
+async def todo_events_handler(
+    user: UserSchema = Depends(get_stream_user), # DB 커넥션을 스트림 내내 잡고 있지 않도록
+    settings: Settings = Depends(get_settings),
+    ) -> StreamingResponse:
+    async def stream() -> AsyncIterator[bytes]:
+        async with get_broker(settings).subscribe(user.id) as queue:
+            yield b"retry: 3000\n\n" # 연결이 끊기면 3초 후 재연결 (EventSource)
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=settings.todo_events_heartbeat)
+                except TimeoutError:
+                    yield b": keep-alive\n\n" # proxy idle timeout 방지
+                    continue
+                if event is None: # 서버 종료
+                    return
+                yield b"event: " + event["type"].encode() + b"\ndata: " + event_adapter.dump_json(event) + b"\n\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}, # nginx buffering off
+    )
@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from cache import todo_cache
+from config import Settings, get_settings
+from database.connection import get_database, pool_status
+from metrics import register_gauge, render
+
+router = APIRouter()
+
+
+@router.get("/")
+def health_check_handler():
+    return {"ping": "pong"}
+
+
+# DB connection pool 상태: checked_out이 size + overflow에 가깝고 wait 시간이 늘면 pool 고갈
+@router.get("/health/db-pool")
+def db_pool_handler():
+    return {name: pool_status(engine) for name, engine in get_database().pools().items()}
+
+
+# todo 조회 캐시 hit/miss
+@router.get("/health/cache")
+def cache_stats_handler(settings: Settings = Depends(get_settings)):
+    return {"enabled": settings.todo_cache_enabled, **todo_cache.stats()}
+
+
+register_gauge(
+    "db_pool_connections",
+    "DB connection pool state",
+    ("engine", "state"),
+    lambda: {
+        (name, state): pool_status(engine)[state]
+        for name, engine in get_database().pools().items()
+        for state in ("checked_out", "overflow", "size")
+    },
+)
+
+
+# prometheus scrape endpoint: route별 latency, 요청당 DB 쿼리 수/시간, redis 시간
+# async: gauge(threadpool 사용량 등)를 event loop에서 읽도록
+@router.get("/metrics", include_in_schema=False)
+async def metrics_handler():
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4")
@@ -1,23 +1,67 @@
 
-from fastapi import Depends, FastAPI, Body, HTTPException, APIRouter
+from fastapi import Depends, FastAPI, Body, Header, HTTPException, APIRouter, Query, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from database.connection import get_db
 #from database.repository import delete_todo, get_todo_by_todo_id, get_todos, create_todo, update_todo, delete_todo
-from database.repository import ToDoRepository, UserRepository
+from database.repository import AsyncToDoRepository
 
 from database.orm import ToDo
-from typing import List
-
-from schema.request import CreateToDoRequest
-from schema.response import ToDoListSchema, ToDoSchema
+from typing import AsyncIterator, List
+
+from schema.request import (
+    BulkCreateToDoRequest,
+    BulkDeleteToDoRequest,
+    BulkUpdateToDoRequest,
+    CreateToDoRequest,
+)
+from schema.response import (
+    BulkItemResultSchema,
+    BulkResultSchema,
+    ToDoChangesSchema,
+    ToDoListSchema,
+    ToDoSchema,
+    ToDoSearchSchema,
+    ToDoStatsSchema,
+    UserSchema,
+    todo_changes_adapter,
+    todo_list_adapter,
+    todo_search_adapter,
+    todo_row_adapter,
+)
 # from main import app
 
-from security import get_access_token
-from service.user import UserService
-from database.orm import User
+from security import get_current_user
+from cache import todo_cache
+from database.search import search_terms
+from concurrency import ConcurrencyLimit
+from stats import ToDoCounts, todo_stats
+from metrics import track
+from config import Settings, get_settings
+
+# route별 동시 실행 제한, 초과시 대기 후 503 (concurrency.py)
+router = APIRouter(prefix="/todos", dependencies=[Depends(ConcurrencyLimit("todo_concurrency"))])
+
+
+# ETag = todo 캐시 버전 (cache.ToDoCache, 생성/수정/삭제마다 증가)
+# If-None-Match가 현재 버전과 같으면 DB 조회, 직렬화 없이 304 (body 없음)
+# ETag를 붙이는 응답의 데이터는 버전에 반영된 변경(seq)까지 복제된 replica 또는 primary에서 읽음
+# (복제 지연된 이전 데이터 + 새 ETag -> 다음 쓰기까지 304로 고정되지 않도록, ToDoRepository.get_todo_rows_by_user)
+def _etag(namespace: str, version: int) -> str:
+    return f'"{namespace}:v{version}"'
+
 
-router = APIRouter(prefix="/todos")
+def _etag_matches(if_none_match: str | None, etag: str | None) -> bool:
+    # 404 응답에는 ETag가 없으므로 일치하는 ETag = 해당 버전을 200으로 받은 적이 있음
+    if not if_none_match or not etag:
+        return False
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+def _etag_headers(etag: str | None) -> dict[str, str]:
+    # private: 유저별 응답, no-cache: 저장은 하되 매번 ETag로 재검증
+    return {"ETag": etag, "Cache-Control": "private, no-cache"} if etag else {}
 
 
 # @router.get("", status_code=200)
@@ -180,80 +224,275 @@ router = APIRouter(prefix="/todos")
 
 # ch63. JWT 적용
 @router.get("", status_code=200)
-def get_todos_handler(
-    access_token: str = Depends(get_access_token),
+async def get_todos_handler(
     order: str| None = None,
-    user_service: UserService = Depends(),
-    user_repo: UserRepository = Depends(),
-    todo_repo: ToDoRepository = Depends()
+    limit: int = Query(default=100, ge=1, le=1000),
+    cursor: int | None = None, # 이전 응답의 next_cursor
+    user: UserSchema = Depends(get_current_user), # 캐시된 인증 유저 (jwt decode, 유저 조회 생략)
+    todo_repo: AsyncToDoRepository = Depends(),
+    if_none_match: str | None = Header(default=None),
+    settings: Settings = Depends(get_settings),
     ) -> ToDoListSchema:
     
-    # print("======================")
-    # print(access_token)
-    # print("======================")
-    
-    username: str = user_service.decode_jwt(access_token=access_token)
-    
-    # username을 기반으로 유저 정보를 조회
-    user: User | None = user_repo.get_user_by_username(username=username)
-    if not user:
-        raise HTTPException(status_code=404, detail="User Not Found")
-    
-    #todos: List[ToDo] = todo_repo.get_todos() 
-    todos: List[ToDo] = user.todos
-    if order and order == "DESC": 
-        return ToDoListSchema(
-        todos = [ToDoSchema.model_validate(todo) for todo in todos[::-1]]
+    # read-through 캐시: hit이면 DB 조회, 직렬화 없이 저장된 json을 그대로 응답
+    namespace: str = todo_cache.user_namespace(user.id)
+    suffix: str = f"{order == 'DESC'}:{limit}:{cursor}"
+    payload: str | None = None
+    if settings.todo_cache_enabled:
+        version, min_seq, payload = await todo_cache.get(namespace, suffix=suffix)
+    else:
+        version, min_seq = await todo_cache.version(namespace)
+
+    etag: str | None = _etag(namespace, version) if version is not None else None
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=_etag_headers(etag))
+    if payload:
+        return Response(content=payload, media_type="application/json", headers=_etag_headers(etag))
+
+    # 정렬은 DB에서 ORDER BY로, 다음 페이지 존재 여부 확인을 위해 limit + 1개 조회
+    # replica가 버전에 반영된 변경(min_seq)까지 복제되었으면 replica, 아니면 primary
+    seq, rows = await todo_repo.get_todo_rows_by_user(
+        user_id=user.id, limit=limit + 1, cursor=cursor, desc=order == "DESC", min_seq=min_seq
+    )
+    next_cursor: int | None = rows[limit - 1][0] if len(rows) > limit else None
+    if version is None: # 버전 키 없음(최초, 만료): 조회 이후에 생성
+        version = await todo_cache.init_version(namespace, seq=seq)
+        etag = _etag(namespace, version) if version is not None else None
+
+    # fast path: ORM 객체 -> ToDoSchema 검증 -> response model 재검증 대신
+    # row tuple에서 바로 json bytes 생성 (benchmarks/serialization.py)
+    with track("serialize"):
+        payload: bytes = todo_list_adapter.dump_json({
+            "todos": [
+                {"id": todo_id, "contents": contents, "is_done": is_done}
+                for todo_id, contents, is_done in rows[:limit]
+            ],
+            "next_cursor": next_cursor,
+        })
+    if settings.todo_cache_enabled:
+        await todo_cache.set(namespace, version, payload, ttl=settings.todo_cache_ttl, suffix=suffix)
+    return Response(content=payload, media_type="application/json", headers=_etag_headers(etag))
+
+
+# 전체 todo를 NDJSON(한 줄에 todo 하나)으로 스트리밍
+# 목록을 메모리에 만들지 않고 server-side cursor에서 읽는 대로 전송 -> 첫 바이트가 바로 전송되고 메모리 일정
+@router.get("/export", status_code=200)
+async def export_todos_handler(
+    user: UserSchema = Depends(get_current_user),
+    todo_repo: AsyncToDoRepository = Depends(),
+    settings: Settings = Depends(get_settings),
+    ) -> StreamingResponse:
+    async def ndjson() -> AsyncIterator[bytes]:
+        async for rows in todo_repo.iter_todo_rows_by_user(
+            user_id=user.id, batch_size=settings.todo_export_batch_size
+        ):
+            yield b"".join(
+                todo_row_adapter.dump_json(
+                    {"id": todo_id, "contents": contents, "is_done": is_done}
+                ) + b"\n"
+                for todo_id, contents, is_done in rows
+            )
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+# 전체/완료/미완료 수: redis에 증감으로 유지되는 통계를 조회 (stats.py)
+# 없거나 refresh=true면 SQL 집계로 다시 채움
+@router.get("/stats", status_code=200)
+async def get_todo_stats_handler(
+    refresh: bool = False,
+    user: UserSchema = Depends(get_current_user),
+    todo_repo: AsyncToDoRepository = Depends()
+    ) -> ToDoStatsSchema:
+    counts: ToDoCounts | None = None if refresh else await todo_stats.get(user.id)
+    if counts is None:
+        counts = await todo_stats.reconcile(user.id, todo_repo)
+    return ToDoStatsSchema(total=counts["total"], done=counts["done"], pending=counts["total"] - counts["done"])
+
+
+# 내용 전문 검색, 관련도 순 (database/search.py)
+# GET /todos와 같은 유저 캐시 버전을 사용하므로 쓰기가 있으면 캐시된 검색 결과도 무효화
+@router.get("/search", status_code=200)
+async def search_todos_handler(
+    q: str = Query(min_length=1, max_length=256),
+    limit: int = Query(default=20, ge=1, le=100),
+    offset: int = Query(default=0, ge=0, le=1000),
+    user: UserSchema = Depends(get_current_user),
+    todo_repo: AsyncToDoRepository = Depends(),
+    settings: Settings = Depends(get_settings),
+    ) -> ToDoSearchSchema:
+    namespace: str = todo_cache.user_namespace(user.id)
+    suffix: str = f"search:{limit}:{offset}:{' '.join(search_terms(q))}"
+    version: int | None = None
+    if settings.todo_cache_enabled:
+        version, _, payload = await todo_cache.get(namespace, suffix=suffix)
+        if payload:
+            return Response(content=payload, media_type="application/json")
+
+    # 버전 키가 없으면 저장하지 않음 (버전은 GET /todos, 쓰기에서 생성)
+    rows: List[tuple[int, str, bool]] = await todo_repo.search_todos(
+        user_id=user.id, query=q, limit=limit + 1, offset=offset
+    )
+    with track("serialize"):
+        payload: bytes = todo_search_adapter.dump_json({
+            "todos": [
+                {"id": todo_id, "contents": contents, "is_done": is_done}
+                for todo_id, contents, is_done in rows[:limit]
+            ],
+            "next_offset": offset + limit if len(rows) > limit else None,
+        })
+    if settings.todo_cache_enabled:
+        await todo_cache.set(namespace, version, payload, ttl=settings.todo_cache_ttl, suffix=suffix)
+    return Response(content=payload, media_type="application/json")
+
+
+# 변경분 조회 (delta sync): since 이후에 생성/수정/삭제된 todo만 seq 순서로
+# 처음에는 since=0 (전체), 이후에는 응답의 next_since로 요청, has_more면 바로 이어서 요청
+@router.get("/changes", status_code=200)
+async def get_todo_changes_handler(
+    since: int = Query(default=0, ge=0),
+    limit: int = Query(default=100, ge=1, le=1000),
+    user: UserSchema = Depends(get_current_user),
+    todo_repo: AsyncToDoRepository = Depends()
+    ) -> ToDoChangesSchema:
+    rows = await todo_repo.get_changes_by_user(user_id=user.id, since=since, limit=limit + 1)
+    changes = rows[:limit]
+    with track("serialize"):
+        payload: bytes = todo_changes_adapter.dump_json({
+            "changes": [
+                {
+                    "id": todo_id, "contents": contents, "is_done": is_done,
+                    "seq": seq, "updated_at": updated_at, "deleted": deleted_at is not None,
+                }
+                for todo_id, contents, is_done, seq, updated_at, deleted_at in changes
+            ],
+            "next_since": changes[-1][3] if changes else since,
+            "has_more": len(rows) > limit,
+        })
+    return Response(content=payload, media_type="application/json")
+
+
+# bulk: /{todo_id} 보다 먼저 등록해야 "bulk"가 todo_id로 매칭되지 않음
+@router.post("/bulk", status_code=201)
+async def bulk_create_todos_handler(
+    request: BulkCreateToDoRequest,
+    user: UserSchema = Depends(get_current_user),
+    todo_repo: AsyncToDoRepository = Depends()
+    ) -> BulkResultSchema:
+    todos: List[ToDo] = []
+    for item in request.todos:
+        todo: ToDo = ToDo.create(request=item)
+        todo.user_id = user.id
+        todos.append(todo)
+
+    todos = await todo_repo.create_todos(todos=todos)
+    return BulkResultSchema(
+        results=[
+            BulkItemResultSchema(id=todo.id, status=201, todo=ToDoSchema.model_validate(todo))
+            for todo in todos
+        ]
     )
 
-    return ToDoListSchema(
-        todos = [ToDoSchema.model_validate(todo) for todo in todos]
+
+@router.patch("/bulk", status_code=200)
+async def bulk_update_todos_handler(
+    request: BulkUpdateToDoRequest,
+    user: UserSchema = Depends(get_current_user),
+    todo_repo: AsyncToDoRepository = Depends()
+    ) -> BulkResultSchema:
+    is_done_by_id: dict[int, bool] = {item.id: item.is_done for item in request.todos}
+    updated: dict[int, ToDo] = {
+        todo.id: todo
+        for todo in await todo_repo.update_todos(user_id=user.id, is_done_by_id=is_done_by_id)
+    }
+    return BulkResultSchema(
+        results=[
+            BulkItemResultSchema(id=todo_id, status=200, todo=ToDoSchema.model_validate(updated[todo_id]))
+            if todo_id in updated
+            else BulkItemResultSchema(id=todo_id, status=404)
+            for todo_id in is_done_by_id
+        ]
+    )
+
+
+@router.delete("/bulk", status_code=200)
+async def bulk_delete_todos_handler(
+    request: BulkDeleteToDoRequest,
+    user: UserSchema = Depends(get_current_user),
+    todo_repo: AsyncToDoRepository = Depends()
+    ) -> BulkResultSchema:
+    todo_ids: List[int] = list(dict.fromkeys(request.ids)) # 순서 유지 중복 제거
+    deleted: set[int] = set(await todo_repo.delete_todos(user_id=user.id, todo_ids=todo_ids))
+    return BulkResultSchema(
+        results=[
+            BulkItemResultSchema(id=todo_id, status=204 if todo_id in deleted else 404)
+            for todo_id in todo_ids
+        ]
     )
 
 
 @router.get("/{todo_id}", status_code=200)
-def get_todo_handler(
+async def get_todo_handler(
     todo_id: int,
-    todo_repo: ToDoRepository = Depends()
+    todo_repo: AsyncToDoRepository = Depends(),
+    if_none_match: str | None = Header(default=None),
+    settings: Settings = Depends(get_settings),
     ) -> ToDoSchema:
-    todo: ToDo | None = todo_repo.get_todo_by_todo_id(todo_id=todo_id)
+    namespace: str = todo_cache.todo_namespace(todo_id)
+    payload: str | None = None
+    if settings.todo_cache_enabled:
+        version, min_seq, payload = await todo_cache.get(namespace)
+    else:
+        version, min_seq = await todo_cache.version(namespace)
+
+    etag: str | None = _etag(namespace, version) if version is not None else None
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=_etag_headers(etag))
+    if payload:
+        return Response(content=payload, media_type="application/json", headers=_etag_headers(etag))
+
+    todo: ToDo | None = await todo_repo.get_todo_by_todo_id(todo_id=todo_id, min_seq=min_seq)
     if todo:
-        return ToDoSchema.model_validate(todo)
+        if version is None: # 있는 todo만 버전 키 생성 (없는 id 조회로 키가 쌓이지 않도록)
+            version = await todo_cache.init_version(namespace, seq=todo.seq or 0)
+            etag = _etag(namespace, version) if version is not None else None
+        payload = ToDoSchema.model_validate(todo).model_dump_json()
+        if settings.todo_cache_enabled:
+            await todo_cache.set(namespace, version, payload, ttl=settings.todo_cache_ttl)
+        return Response(content=payload, media_type="application/json", headers=_etag_headers(etag))
     raise HTTPException(status_code=404, detail="ToDo Not Found")
 
 
 @router.post("", status_code=201)
-def create_todo_handler(
+async def create_todo_handler(
     request: CreateToDoRequest,
-    todo_repo: ToDoRepository = Depends()
+    todo_repo: AsyncToDoRepository = Depends()
     ) -> ToDoSchema:
     todo: ToDo = ToDo.create(request=request) 
-    todo: ToDo = todo_repo.create_todo(todo=todo) 
+    todo: ToDo = await todo_repo.create_todo(todo=todo) 
     return ToDoSchema.model_validate(todo)
 
 
 @router.patch("/{todo_id}", status_code=200)
-def update_todo_handler(
+async def update_todo_handler(
     todo_id: int,
     is_done: bool = Body(..., embed=True),
-    todo_repo: ToDoRepository = Depends()
+    todo_repo: AsyncToDoRepository = Depends()
     ):
-    todo: ToDo | None = todo_repo.get_todo_by_todo_id(todo_id=todo_id)
-    if todo: #update
-        todo.done() if is_done else todo.undone()
-        todo: ToDo = todo_repo.update_todo(todo=todo)
+    # 조회 + 수정 + refresh 대신 UPDATE 한번 (RETURNING), 없으면 404
+    todo: ToDo | None = await todo_repo.update_todo_is_done(todo_id=todo_id, is_done=is_done)
+    if todo:
         return ToDoSchema.model_validate(todo) 
     raise HTTPException(status_code=404, detail="ToDo Not Found")
 
 
 # delete
 @router.delete("/{todo_id}", status_code=204)
-def delete_todo_handler(
+async def delete_todo_handler(
     todo_id: int,
-    todo_repo: ToDoRepository = Depends()
+    todo_repo: AsyncToDoRepository = Depends()
     ):
-    todo: ToDo | None = todo_repo.get_todo_by_todo_id(todo_id=todo_id)
+    # 존재 확인 SELECT 없이 soft delete UPDATE 한번, 삭제된 row가 없으면 404
+    todo: ToDo | None = await todo_repo.delete_todo(todo_id=todo_id)
     if not todo:
         raise HTTPException(status_code=404, detail="ToDo Not Found")
-    
-    todo_repo.delete_todo(todo_id=todo_id)
\ No newline at end of file
@@ -1,27 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException
 from schema.request import SignUpRequest
 from service.user import UserService
 from database.orm import User
-from database.repository import UserRepository
+from database.repository import AsyncUserRepository
 from schema.response import UserSchema
 from schema.request import LogInRequest
 from schema.response import JWTResponse
 from schema.request import CreateOTPRequest
-from security import get_access_token
-from cache import redis_client
+from security import get_access_token, get_current_user
+from cache import get_redis, save_otp, verify_otp
 from schema.request import VerifyOTPRequest
+from config import Settings, get_settings
+from jobs import get_email_queue
+from redis.asyncio import Redis
+from sqlalchemy.exc import IntegrityError
+from ratelimit import RateLimit
+from concurrency import ConcurrencyLimit
 
 router = APIRouter(prefix="/users")
 
-@router.post("/sign-up", status_code=201)
-def user_sign_up_handler(
+# RateLimit은 handler(bcrypt 해싱)보다 먼저 실행 -> 초과시 해싱 없이 429
+# ConcurrencyLimit: 동시에 해싱하는 요청 수 제한, 넘치면 대기 후 503
+@router.post("/sign-up", status_code=201, dependencies=[
+    Depends(RateLimit("sign-up", body_field="username")), Depends(ConcurrencyLimit("auth_concurrency")),
+])
+async def user_sign_up_handler(
     request: SignUpRequest,
     user_service: UserService = Depends(),
-    user_repo: UserRepository = Depends(),
+    user_repo: AsyncUserRepository = Depends(),
     ):
     # 1. request body로 username, password 받기
     # 2. password -> hassing -> hassed_password
-    hashed_password: str = user_service.hash_password(
+    hashed_password: str = await user_service.hash_password(
         plain_password=request.password
         )
     
@@ -32,22 +42,27 @@ def user_sign_up_handler(
     ) # 이시점에는 user의 id가 None이다. orm 객체로만 있는 상태
     
     # 4. user -> db insert
-    user: User = user_repo.save_user(user=user) # 이시점에는 user의 id가 int이다. orm 객체가 db에 저장되고 다시 읽어와서 반영된 상태
+    try:
+        user: User = await user_repo.save_user(user=user) # 이시점에는 user의 id가 int이다. orm 객체가 db에 저장되고 다시 읽어와서 반영된 상태
+    except IntegrityError: # username unique index
+        raise HTTPException(status_code=409, detail="Username Already Exists")
     
     
     # 5. return user(id, username) # pw는 알려주면 안되기 때문에
     return UserSchema.model_validate(user)
 
 
-@router.post("/log-in")
-def user_log_in_handler(
+@router.post("/log-in", dependencies=[
+    Depends(RateLimit("log-in", body_field="username")), Depends(ConcurrencyLimit("auth_concurrency")),
+])
+async def user_log_in_handler(
     request: LogInRequest,
     user_service: UserService = Depends(),
-    user_repo: UserRepository = Depends(),
+    user_repo: AsyncUserRepository = Depends(),
     ):
     # 1. request body로 username, password 받기
     # 2. DB에서 유저 정보 읽어오기
-    user: User | None = user_repo.get_user_by_username(
+    user: User | None = await user_repo.get_user_by_username(
         username=request.username
         )
     if not user:
@@ -57,7 +72,7 @@ def user_log_in_handler(
             )
     
     # 3. username, password 검증(bcrypt.checkpw)
-    verified: bool = user_service.verify_password(
+    verified: bool = await user_service.verify_password(
         plain_password=request.password,
         hashed_password=user.password
     )
@@ -67,6 +82,13 @@ def user_log_in_handler(
             detail="Not Authorized"
             )
     
+    # bcrypt cost 설정이 바뀌었으면 로그인 성공한 김에 새 cost로 재해싱
+    if user_service.password_needs_rehash(hashed_password=user.password):
+        await user_repo.update_password(
+            user_id=user.id,
+            hashed_password=await user_service.hash_password(plain_password=request.password),
+        )
+
     # 4. jwt 생성
     access_token: str = user_service.create_jwt(
         username=user.username
@@ -75,20 +97,21 @@ def user_log_in_handler(
     return JWTResponse(access_token=access_token)
 
 
-@router.post("/email/otp")
-def create_otp_handler(
+@router.post("/email/otp", dependencies=[Depends(RateLimit("email-otp", body_field="email"))])
+async def create_otp_handler(
     request: CreateOTPRequest, 
     _: str = Depends(get_access_token), # 인증된 사용자 확인, 검증만 하고 사용하지 않으므로로
     user_service: UserService = Depends(),
+    redis: Redis = Depends(get_redis),
+    settings: Settings = Depends(get_settings),
 ):
     # 1. access_token 파라미터 받기: 로그인 된 사용자인지 확인
     # 2. request body로 email 정보 받기
     # 3. otp 생성 (랜덤 값 4자리)
     otp: int = user_service.create_otp()
     
-    # 4. email, otp를 key, value로 redis에 저장 (3분 만료)
-    redis_client.set(name=request.email, value=otp)
-    redis_client.expire(name=request.email, time=3*60) # 3분 만료
+    # 4. email, otp를 key, value로 redis에 저장 (3분 만료, SET ... EX 한번으로)
+    await save_otp(redis, email=request.email, otp=otp, ttl=settings.otp_ttl)
     
     # 5. otp를 email로 전송???
     
@@ -96,42 +119,31 @@ def create_otp_handler(
 
 
 @router.post("/email/otp/verify")
-def verify_otp_handler(
+async def verify_otp_handler(
     request: VerifyOTPRequest,
-    background_tasks: BackgroundTasks,
-    access_token: str = Depends(get_access_token), # 인증된 사용자 확인
-    user_service: UserService = Depends(),
-    user_repo: UserRepository = Depends(),
+    user: UserSchema = Depends(get_current_user), # 인증된 사용자 확인
+    redis: Redis = Depends(get_redis),
+    settings: Settings = Depends(get_settings),
 ):
     # 1. access_token 파라미터 받기: 로그인 된 사용자인지 확인
     # 2. request body로 email, otp 정보 받기
-    otp: str | None = redis_client.get(name=request.email) # redis는 문자열로 저장되므로
-    if not otp:
-        raise HTTPException(
-            status_code=400,
-            detail="Bad Request"
-        )
-    if request.otp != int(otp):
+    # 3. request의 otp와 redis의 otp 비교, 검증
+    # 비교 + 삭제(재사용 방지) + 시도횟수 제한을 lua script로 원자적으로 처리
+    verified: bool = await verify_otp(
+        redis, email=request.email, otp=request.otp, max_attempts=settings.otp_max_attempts
+    )
+    if not verified:
         raise HTTPException(
             status_code=400,
             detail="Bad Request"
         )
         
-    # 3. request의 otp와 redis의 otp 비교, 금증
-    username: str = user_service.decode_jwt(access_token=access_token)
-    user: User | None = user_repo.get_user_by_username(username=username)
-    if not user:
-        raise HTTPException(
-            status_code=404,
-            detail="User Not Found"
-        )
+    # 유저 조회는 get_current_user에서 처리
         
     # 4. user(email) 저장: 실제 구현은 안함
     
     # 5.이메일 전송효과 추가
-    background_tasks.add_task(
-        user_service.send_email_to_user, # 함수 이름
-        email="admin@fastapi.com" # 함수 파라미터
-        )
+    # BackgroundTasks 대신 작업 큐에 넣고 바로 응답 (전송은 email_queue worker가 처리)
+    get_email_queue(settings).enqueue("admin@fastapi.com")
     # user_service.send_email_to_user(email="admin@fastapi.com")
-    return UserSchema.model_validate(user)
\ No newline at end of file
+    return user
\ No newline at end of file
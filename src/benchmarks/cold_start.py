@@ -0,0 +1,110 @@
+# worker cold start 측정: 새 프로세스에서
+# - import: import main (엔진/redis client를 만들지 않으므로 모듈 로딩만)
+# - startup: create_app lifespan 시작 (엔진, redis 생성 + 커넥션 warm-up + 스키마 확인)
+# - first_request: 첫 GET /todos 응답 시간 (warm-up을 끄면 여기서 커넥션 생성 비용 발생)
+# sqlite + fakeredis 위에서 측정하므로 커넥션 생성 비용은 실제 MySQL보다 작게 나옴
+#
+# 실행: cd src && python -m benchmarks.cold_start --runs 5 --warmup 0 5 [--json]
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5, help="warmup 설정별 프로세스 실행 횟수")
+    parser.add_argument("--warmup", type=int, nargs="+", default=[0, 5], help="db_pool_warmup 값들")
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+async def child() -> dict:
+    # 측정 대상 프로세스: 결과를 json 한 줄로 출력
+    start = time.perf_counter()
+    import main
+    imported = time.perf_counter()
+
+    import fakeredis
+    import httpx
+    from service.user import UserService
+
+    main.init_redis = lambda settings: fakeredis.FakeAsyncRedis(decode_responses=True)
+    app = main.create_app()
+    async with app.router.lifespan_context(app):
+        started = time.perf_counter()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            headers = {"Authorization": f"Bearer {UserService().create_jwt(username='user0')}"}
+            response = await client.get("/todos", headers=headers)
+            assert response.status_code == 200, response.text
+        first_request = time.perf_counter()
+
+    return {
+        "import_ms": (imported - start) * 1000,
+        "startup_ms": (started - imported) * 1000,
+        "first_request_ms": (first_request - started) * 1000,
+    }
+
+
+def run(warmup: int, runs: int, env: dict) -> dict:
+    samples: list[dict] = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.cold_start", "--child"],
+            env={**env, "DB_POOL_WARMUP": str(warmup)},
+            capture_output=True, text=True, check=True,
+        ).stdout
+        sample = json.loads(output.strip().splitlines()[-1])
+        sample["process_ms"] = (time.perf_counter() - start) * 1000 # 인터프리터 시작 ~ 종료
+        samples.append(sample)
+
+    return {
+        "db_pool_warmup": warmup,
+        "runs": runs,
+        **{
+            name: round(statistics.median(sample[name] for sample in samples), 2)
+            for name in ("import_ms", "startup_ms", "first_request_ms", "process_ms")
+        },
+    }
+
+
+def main() -> None:
+    args = parse_args()
+    if args.child:
+        print(json.dumps(asyncio.run(child())))
+        return
+
+    # tests/conftest.py, benchmarks/load.py와 같은 sqlite 파일 DB
+    db_path = os.path.join(tempfile.mkdtemp(), "cold_start.db")
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{db_path}",
+        "ASYNC_DATABASE_URL": f"sqlite+aiosqlite:///{db_path}",
+        "TODO_CACHE_ENABLED": "false",
+    }
+    os.environ.update(env)
+    from benchmarks.load import seed
+    seed(users=1, todos_per_user=100)
+
+    results = [run(warmup, args.runs, env) for warmup in args.warmup]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'warmup':>6} {'import':>10} {'startup':>10} {'first req':>10} {'process':>10}  (median ms)")
+    for r in results:
+        print(
+            f"{r['db_pool_warmup']:>6} {r['import_ms']:>10.2f} {r['startup_ms']:>10.2f} "
+            f"{r['first_request_ms']:>10.2f} {r['process_ms']:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# API 부하 테스트: main.app을 sqlite + fakeredis 위에서 띄우고 (in-process, ASGI transport)
+# 라우트별로 동시 요청을 보내서 req/s, p50/p95/p99 latency를 json으로 출력
+#
+# 실행: cd src && python -m benchmarks.load --users 10 --todos-per-user 1000 --requests 2000 --concurrency 50
+#       결과 비교: python -m benchmarks.load --output bench_output.json
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from typing import Awaitable, Callable
+
+SCENARIOS = ["todos", "todo", "log_in", "otp"]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--todos-per-user", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=1000, help="시나리오별 요청 수")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--bcrypt-rounds", type=int, default=12)
+    parser.add_argument("--cache", action="store_true", help="todo 조회 캐시 사용")
+    parser.add_argument("--output", help="결과를 저장할 json 파일 (없으면 stdout)")
+    return parser.parse_args()
+
+
+def configure(args: argparse.Namespace) -> None:
+    # main을 import 하기 전에 sqlite 파일 DB 사용하도록 설정 (tests/conftest.py와 동일)
+    db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["ASYNC_DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+    os.environ["BCRYPT_ROUNDS"] = str(args.bcrypt_rounds)
+    os.environ["TODO_CACHE_ENABLED"] = str(args.cache).lower()
+    os.environ["EMAIL_SEND_DELAY"] = "0"
+    os.environ["RATE_LIMIT_ENABLED"] = "false" # 같은 ip/유저로 반복 요청하므로
+
+
+def seed(users: int, todos_per_user: int) -> None:
+    import bcrypt
+    from sqlalchemy import insert
+
+    from config import settings
+    from database.connection import close_db, get_database
+    from database.orm import Base, ToDo, User
+
+    database = get_database()
+    Base.metadata.create_all(bind=database.engine)
+    password = bcrypt.hashpw(b"password", bcrypt.gensalt(rounds=settings.bcrypt_rounds)).decode()
+    with database.session_factory() as session:
+        session.execute(
+            insert(User), [{"username": f"user{i}", "password": password} for i in range(users)]
+        )
+        for user_id in range(1, users + 1):
+            session.execute(insert(ToDo), [
+                {"user_id": user_id, "contents": f"todo {i}", "is_done": i % 2 == 0}
+                for i in range(todos_per_user)
+            ])
+        session.commit()
+    asyncio.run(close_db()) # app lifespan에서 다시 생성
+
+
+async def measure(
+    name: str, call: Callable[[], Awaitable[bool]], requests: int, concurrency: int
+) -> dict:
+    latencies: list[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker() -> None:
+        nonlocal errors
+        for _ in remaining:
+            start = time.perf_counter()
+            ok: bool = await call()
+            latencies.append(time.perf_counter() - start)
+            errors += not ok
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "scenario": name,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentiles[49] * 1000, 2),
+        "p95_ms": round(percentiles[94] * 1000, 2),
+        "p99_ms": round(percentiles[98] * 1000, 2),
+    }
+
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    import fakeredis
+    import httpx
+
+    import cache
+    from main import app
+    from service.user import UserService
+
+    results: list[dict] = []
+    async with app.router.lifespan_context(app):
+        cache.redis_client = fakeredis.FakeAsyncRedis(decode_responses=True)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            tokens = [UserService().create_jwt(username=f"user{i}") for i in range(args.users)]
+            todo_count = args.users * args.todos_per_user
+
+            def auth() -> dict:
+                return {"Authorization": f"Bearer {random.choice(tokens)}"}
+
+            async def todos() -> bool:
+                response = await client.get("/todos", headers=auth())
+                return response.status_code == 200
+
+            async def todo() -> bool:
+                response = await client.get(f"/todos/{random.randint(1, todo_count)}")
+                return response.status_code == 200
+
+            async def log_in() -> bool:
+                body = {"username": f"user{random.randrange(args.users)}", "password": "password"}
+                response = await client.post("/users/log-in", json=body)
+                return response.status_code == 200
+
+            async def otp() -> bool:
+                headers, email = auth(), f"{random.random()}@bench.com"
+                response = await client.post("/users/email/otp", json={"email": email}, headers=headers)
+                if response.status_code != 200:
+                    return False
+                body = {"email": email, "otp": response.json()["otp"]}
+                response = await client.post("/users/email/otp/verify", json=body, headers=headers)
+                return response.status_code == 200
+
+            calls = {"todos": todos, "todo": todo, "log_in": log_in, "otp": otp}
+            for name in args.scenarios:
+                await calls[name]() # warm up
+                results.append(await measure(name, calls[name], args.requests, args.concurrency))
+    return results
+
+
+def main() -> None:
+    args = parse_args()
+    configure(args)
+    seed(args.users, args.todos_per_user)
+    results = asyncio.run(run(args))
+
+    report = json.dumps({
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        "results": results,
+    }, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    else:
+        sys.stdout.write(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
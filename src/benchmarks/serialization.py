@@ -0,0 +1,66 @@
+# GET /todos 응답 직렬화 비교 (DB 조회 제외)
+# - current: ORM 객체 -> ToDoSchema.model_validate -> ToDoListSchema -> response model 재검증 -> json
+# - fast: row tuple -> todo_list_adapter.dump_json (검증 없이 한번에)
+#
+# 실행: cd src && python -m benchmarks.serialization [--rows 10 1000 100000] [--json]
+import argparse
+import json
+import timeit
+
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from database.orm import ToDo
+from schema.response import ToDoListSchema, ToDoSchema, todo_list_adapter
+
+response_adapter = TypeAdapter(ToDoListSchema)
+
+
+def current_path(todos: list[ToDo]) -> bytes:
+    response = ToDoListSchema(
+        todos=[ToDoSchema.model_validate(todo) for todo in todos], next_cursor=None
+    )
+    # FastAPI가 response model(-> ToDoListSchema)로 다시 검증한 뒤 json으로 변환하는 과정
+    content = response_adapter.dump_python(
+        response_adapter.validate_python(response), mode="json"
+    )
+    return JSONResponse(content).body
+
+
+def fast_path(rows: list[tuple[int, str, bool]]) -> bytes:
+    return todo_list_adapter.dump_json({
+        "todos": [
+            {"id": todo_id, "contents": contents, "is_done": is_done}
+            for todo_id, contents, is_done in rows
+        ],
+        "next_cursor": None,
+    })
+
+
+def run(n: int) -> dict:
+    rows = [(i, f"FastAPI Section {i}", i % 2 == 0) for i in range(1, n + 1)]
+    todos = [ToDo(id=i, contents=contents, is_done=is_done) for i, contents, is_done in rows]
+    assert json.loads(current_path(todos)) == json.loads(fast_path(rows))
+
+    number = max(1, 100_000 // n)
+    result = {"rows": n}
+    for name, fn, arg in (("current", current_path, todos), ("fast", fast_path, rows)):
+        seconds = min(timeit.repeat(lambda: fn(arg), number=number, repeat=5)) / number
+        result[f"{name}_ms"] = round(seconds * 1000, 4)
+    result["speedup"] = round(result["current_ms"] / result["fast_ms"], 1)
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10, 1_000, 100_000])
+    parser.add_argument("--json", action="store_true", help="결과를 json으로 출력")
+    args = parser.parse_args()
+
+    results = [run(n) for n in args.rows]
+    if args.json:
+        print(json.dumps(results))
+    else:
+        print(f"{'rows':>8} {'current(ms)':>12} {'fast(ms)':>10} {'speedup':>8}")
+        for r in results:
+            print(f"{r['rows']:>8} {r['current_ms']:>12} {r['fast_ms']:>10} {r['speedup']:>7}x")
@@ -1,9 +1,268 @@
-import redis
-
-redis_client = redis.Redis(
-    host="127.0.0.1", 
-    port=6379, 
-    db=0, 
-    encoding = "UTF-8", 
-    decode_responses=True
-    )
\ No newline at end of file
+import logging
+import time
+
+import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
+
+from config import Settings, settings
+from metrics import record_redis_call
+
+logger = logging.getLogger(__name__)
+
+
+# 명령/파이프라인 실행 시간을 요청별 metrics에 기록 (Server-Timing, /metrics)
+class InstrumentedPipeline(Pipeline):
+    async def execute(self, raise_on_error: bool = True):
+        start = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error=raise_on_error)
+        finally:
+            record_redis_call(time.perf_counter() - start)
+
+
+class InstrumentedRedis(redis.Redis):
+    async def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            record_redis_call(time.perf_counter() - start)
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None) -> Pipeline:
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+# app lifespan에서 생성/종료 (main.py)
+redis_client: redis.Redis | None = None
+
+
+def init_redis(settings: Settings) -> InstrumentedRedis:
+    global redis_client
+    # from_url로 만든 client가 connection pool을 소유 -> aclose()시 pool도 함께 정리
+    redis_client = InstrumentedRedis.from_url(
+        settings.redis_url,
+        max_connections=settings.redis_max_connections,
+        encoding="UTF-8",
+        decode_responses=True,
+    )
+    return redis_client
+
+
+async def close_redis() -> None:
+    global redis_client
+    if redis_client is not None:
+        await redis_client.aclose()
+        redis_client = None
+
+
+def get_redis() -> redis.Redis:
+    # lifespan 밖(스크립트, 테스트)에서 호출되어도 동작하도록 lazy init
+    return redis_client or init_redis(settings)
+
+
+# OTP 검증: GET + 비교 + 삭제를 하나의 스크립트로 원자적으로 실행 (1 round trip)
+# - 일치: otp, 시도횟수 삭제 후 1 (재사용 불가)
+# - 불일치: 시도횟수 증가, max_attempts 도달시 otp 삭제 후 0
+# - otp 없음(만료/삭제): -1
+VERIFY_OTP_SCRIPT = """
+local otp = redis.call('GET', KEYS[1])
+if not otp then
+    return -1
+end
+if otp == ARGV[1] then
+    redis.call('DEL', KEYS[1], KEYS[2])
+    return 1
+end
+local attempts = redis.call('INCR', KEYS[2])
+if attempts == 1 then
+    redis.call('PEXPIRE', KEYS[2], redis.call('PTTL', KEYS[1]))
+end
+if attempts >= tonumber(ARGV[2]) then
+    redis.call('DEL', KEYS[1], KEYS[2])
+end
+return 0
+"""
+
+
+def _otp_keys(email: str) -> list[str]:
+    return [f"otp:{email}", f"otp:{email}:attempts"]
+
+
+async def save_otp(client: redis.Redis, email: str, otp: int, ttl: int) -> None:
+    otp_key, attempts_key = _otp_keys(email)
+    # SET ... EX + 이전 시도횟수 초기화를 한번에 전송
+    async with client.pipeline(transaction=True) as pipe:
+        pipe.set(name=otp_key, value=otp, ex=ttl)
+        pipe.delete(attempts_key)
+        await pipe.execute()
+
+
+async def verify_otp(client: redis.Redis, email: str, otp: int, max_attempts: int) -> bool:
+    script = client.register_script(VERIFY_OTP_SCRIPT)
+    return await script(keys=_otp_keys(email), args=[otp, max_attempts]) == 1
+
+
+# 버전 기반 캐시: {namespace}:version 값을 쓰기마다 INCR 하고, 데이터는 {namespace}:v{version}:{suffix}에 저장
+# - 버전 조회 + 데이터 조회를 하나의 script로 (1 round trip)
+# - 쓰기 도중 읽은 이전 데이터는 이전 버전 키에 저장되므로 다시 읽히지 않고 TTL로 만료됨
+# - 버전은 ETag로도 사용 (api/todo.py): 버전 키가 없으면(최초, 만료) 0이 아니라 redis 서버 시간(us)에서 시작
+#   -> 만료 후 다시 만들어진 버전이 이전에 내려준 ETag와 겹치지 않음
+# - 조회는 키를 만들지 않음 (없는 todo id 조회마다 키가 생기지 않도록), 없으면 버전 없음 = ETag, 캐시 사용 X
+#   버전 키는 쓰기(BUMP_VERSIONS_SCRIPT) 또는 DB에서 데이터를 확인한 조회(INIT_VERSION_SCRIPT)에서만 생성
+# - {namespace}:seq: 버전에 반영된 가장 큰 변경 번호(seq), replica가 이 번호까지 복제되었으면 replica에서 읽어도
+#   버전과 같거나 새로운 데이터 (database/replica.py)
+VERSION_INIT = """
+local function init_version(key, ttl)
+    local time = redis.call('TIME')
+    -- lua 5.1 number는 %.14g로 문자열 변환되어 자릿수가 잘리므로 문자열로 조합
+    local version = time[1] .. string.format('%06d', tonumber(time[2]))
+    redis.call('SET', key, version, 'EX', ttl)
+    return version
+end
+
+local function raise_seq(key, seq, ttl)
+    if tonumber(seq) > (tonumber(redis.call('GET', key)) or -1) then
+        redis.call('SET', key, seq, 'EX', ttl)
+    else
+        redis.call('EXPIRE', key, ttl)
+    end
+end
+"""
+
+# KEYS: 버전 키, seq 키, ARGV: namespace, suffix, payload 조회 여부(1/0)
+# {버전, seq, payload}, 버전 키가 없으면 빈 목록
+READ_VERSIONED_SCRIPT = """
+local version = redis.call('GET', KEYS[1])
+if not version then
+    return {}
+end
+local seq = redis.call('GET', KEYS[2]) or '0'
+if ARGV[3] == '0' then
+    return {version, seq}
+end
+return {version, seq, redis.call('GET', ARGV[1] .. ':v' .. version .. ':' .. ARGV[2])}
+"""
+
+# KEYS: 버전 키, seq 키, ARGV: version ttl, 읽은 데이터의 seq
+# 이미 있으면(그 사이의 쓰기가 만든 버전) nil -> 읽은 데이터가 그 쓰기 이전일 수 있으므로 사용 X
+INIT_VERSION_SCRIPT = VERSION_INIT + """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return false
+end
+raise_seq(KEYS[2], ARGV[2], ARGV[1])
+return init_version(KEYS[1], ARGV[1])
+"""
+
+# KEYS: (버전 키, seq 키) 반복, ARGV: version ttl, namespace별 변경 번호
+BUMP_VERSIONS_SCRIPT = VERSION_INIT + """
+for i = 1, #KEYS, 2 do
+    if redis.call('EXISTS', KEYS[i]) == 1 then
+        redis.call('INCR', KEYS[i])
+        redis.call('EXPIRE', KEYS[i], ARGV[1])
+    else
+        init_version(KEYS[i], ARGV[1])
+    end
+    raise_seq(KEYS[i + 1], ARGV[(i + 1) / 2 + 1], ARGV[1])
+end
+return #KEYS / 2
+"""
+
+
+class ToDoCache:
+    # todo:{todo_id}    -> ToDoSchema json (GET /todos/{todo_id})
+    # todos:{user_id}   -> ToDoListSchema json, 쿼리 파라미터별 (GET /todos)
+    version_ttl: int = 24 * 60 * 60
+
+    def __init__(self):
+        self.hits: int = 0
+        self.misses: int = 0
+        self.errors: int = 0
+
+    @staticmethod
+    def todo_namespace(todo_id: int) -> str:
+        return f"todo:{todo_id}"
+
+    @staticmethod
+    def user_namespace(user_id: int) -> str:
+        return f"todos:{user_id}"
+
+    @staticmethod
+    def _keys(namespace: str) -> list[str]:
+        return [f"{namespace}:version", f"{namespace}:seq"]
+
+    async def _read(self, namespace: str, suffix: str, payload: bool) -> list:
+        script = get_redis().register_script(READ_VERSIONED_SCRIPT)
+        return await script(keys=self._keys(namespace), args=[namespace, suffix, int(payload)])
+
+    async def get(self, namespace: str, suffix: str = "") -> tuple[int | None, int, str | None]:
+        # (현재 버전, 버전에 반영된 seq, 캐시된 payload) 반환, 버전 키가 없거나 redis 장애시 (None, 0, None)
+        try:
+            result = await self._read(namespace, suffix, payload=True)
+        except redis.RedisError:
+            logger.warning("todo cache read failed: %s", namespace, exc_info=True)
+            self.errors += 1
+            return None, 0, None
+
+        version, seq, payload = result or (None, 0, None)
+        if payload is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return int(version) if version is not None else None, int(seq), payload
+
+    async def version(self, namespace: str) -> tuple[int | None, int]:
+        # 캐시를 꺼도 ETag를 위해 (버전, seq)만 조회, 버전 키가 없으면 (None, 0)
+        try:
+            result = await self._read(namespace, "", payload=False)
+        except redis.RedisError:
+            logger.warning("todo version read failed: %s", namespace, exc_info=True)
+            self.errors += 1
+            return None, 0
+        return (int(result[0]), int(result[1])) if result else (None, 0)
+
+    async def init_version(self, namespace: str, seq: int) -> int | None:
+        # 버전 키가 없을 때 DB에서 데이터를 읽은 뒤 호출 (없는 todo는 호출하지 않음), seq: 읽은 데이터의 변경 번호
+        # 그 사이 쓰기가 버전을 만들었으면 None (읽은 데이터가 이전 데이터일 수 있음)
+        try:
+            script = get_redis().register_script(INIT_VERSION_SCRIPT)
+            version = await script(keys=self._keys(namespace), args=[self.version_ttl, seq])
+        except redis.RedisError:
+            logger.warning("todo version init failed: %s", namespace, exc_info=True)
+            self.errors += 1
+            return None
+        return int(version) if version is not None else None
+
+    async def set(self, namespace: str, version: int | None, payload: str, ttl: int, suffix: str = "") -> None:
+        if version is None: # 버전 조회 실패
+            return
+        try:
+            await get_redis().set(
+                name=f"{namespace}:v{version}:{suffix}", value=payload, ex=ttl
+            )
+        except redis.RedisError:
+            logger.warning("todo cache write failed: %s", namespace, exc_info=True)
+            self.errors += 1
+
+    async def invalidate(self, seqs: dict[str, int]) -> None:
+        # 버전을 올려서 이전 데이터를 더 이상 읽지 않도록, 이전 ETag도 무효화 (캐시를 꺼도 항상 실행)
+        # seqs: namespace -> 이번 변경의 가장 큰 seq
+        try:
+            script = get_redis().register_script(BUMP_VERSIONS_SCRIPT)
+            await script(
+                keys=[key for namespace in seqs for key in self._keys(namespace)],
+                args=[self.version_ttl, *seqs.values()],
+            )
+        except redis.RedisError:
+            logger.warning("todo cache invalidation failed: %s", list(seqs), exc_info=True)
+            self.errors += 1
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+
+todo_cache = ToDoCache()
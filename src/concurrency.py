@@ -0,0 +1,121 @@
+import asyncio
+import math
+from collections import deque
+from typing import AsyncIterator
+
+from anyio import to_thread
+from fastapi import HTTPException, Request
+
+from config import get_settings
+from metrics import register_gauge
+
+
+class ConcurrencyLimiter:
+    # 동시에 limit개까지 실행, 초과분은 max_waiting개까지 wait_timeout초 동안 대기, 그 외는 바로 거절(503)
+    # event loop 안에서만 사용 (테스트처럼 요청마다 loop가 바뀌어도 동작하도록 asyncio.Semaphore 대신 future 사용)
+    def __init__(self):
+        self.active: int = 0
+        self.rejected: int = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self, limit: int, max_waiting: int, wait_timeout: float) -> bool:
+        if self.active < limit and not self._waiters:
+            self.active += 1
+            return True
+        if len(self._waiters) >= max_waiting:
+            self.rejected += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait([waiter], timeout=wait_timeout)
+        except asyncio.CancelledError: # 대기 중 클라이언트 연결 종료 등
+            if waiter.done():
+                self.release() # 이미 넘겨받은 슬롯은 다음 대기자에게
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            raise
+        if not waiter.done(): # wait_timeout 초과
+            waiter.cancel()
+            self._waiters.remove(waiter)
+            self.rejected += 1
+            return False
+        return True
+
+    def release(self) -> None:
+        # 대기자가 있으면 슬롯을 바로 넘겨줌 (active 유지)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+limiters: dict[str, ConcurrencyLimiter] = {}
+
+
+class ConcurrencyLimit:
+    # APIRouter(dependencies=[Depends(ConcurrencyLimit("todo_concurrency"))])
+    # route(템플릿 경로)마다 별도 limiter, 동시 실행 수는 settings.{setting}
+    # 느린 route(bcrypt, DB 지연)가 threadpool, DB pool 등 공용 자원을 모두 차지하지 않도록
+    def __init__(self, setting: str):
+        self.setting = setting
+
+    async def __call__(self, request: Request) -> AsyncIterator[None]:
+        settings = get_settings(request)
+        route = getattr(request.scope.get("route"), "path", request.url.path)
+        limiter = limiters.setdefault(f"{request.method} {route}", ConcurrencyLimiter())
+        acquired = await limiter.acquire(
+            limit=getattr(settings, self.setting),
+            max_waiting=settings.concurrency_queue_size,
+            wait_timeout=settings.concurrency_wait_timeout,
+        )
+        if not acquired:
+            raise HTTPException(
+                status_code=503,
+                detail="Service Unavailable",
+                headers={"Retry-After": str(math.ceil(settings.concurrency_wait_timeout) or 1)},
+            )
+        try:
+            yield
+        finally:
+            limiter.release()
+
+
+def configure_threadpool(size: int) -> None:
+    # sync handler, run_in_threadpool(db_async=False 경로, 스키마 확인 등)가 쓰는 anyio 기본 threadpool 크기
+    # event loop별 값이므로 app lifespan 안에서 호출
+    to_thread.current_default_thread_limiter().total_tokens = size
+
+
+def _threadpool_stats() -> dict:
+    try:
+        stats = to_thread.current_default_thread_limiter().statistics()
+    except RuntimeError: # event loop 밖에서 호출
+        return {}
+    return {
+        ("borrowed",): stats.borrowed_tokens,
+        ("total",): stats.total_tokens,
+        ("waiting",): stats.tasks_waiting,
+    }
+
+
+# saturation: active가 limit에 붙어 있고 waiting/rejected가 늘면 worker 또는 limit 증설
+register_gauge(
+    "route_concurrency",
+    "In-flight and queued requests per concurrency-limited route",
+    ("route", "state"),
+    lambda: {
+        (route, state): getattr(limiter, state)
+        for route, limiter in limiters.items()
+        for state in ("active", "waiting", "rejected")
+    },
+)
+register_gauge("threadpool_tokens", "AnyIO default threadpool usage", ("state",), _threadpool_stats)
@@ -0,0 +1,159 @@
+import logging
+from typing import Callable
+
+from sqlalchemy import Column, Connection, Engine, Index, func, inspect, select, text, update
+from sqlalchemy.schema import CreateColumn
+
+from database.orm import TODO_SEARCH_DDL, Base, ToDo, User
+
+logger = logging.getLogger(__name__)
+
+# orm.py에 선언한 컬럼, 인덱스를 이미 만들어진 테이블(README의 CREATE TABLE)에 추가
+# python -m database.migrations  (MySQL에서 직접 실행한다면 아래와 같음)
+#   ALTER TABLE user ADD COLUMN todo_seq INTEGER NOT NULL DEFAULT 0;
+#   ALTER TABLE todo ADD COLUMN seq INTEGER NOT NULL DEFAULT 0;
+#   ALTER TABLE todo ADD COLUMN updated_at DATETIME;
+#   ALTER TABLE todo ADD COLUMN deleted_at DATETIME;
+#   UPDATE todo SET seq = id, updated_at = NOW();
+#   UPDATE user SET todo_seq = (SELECT COALESCE(MAX(seq), 0) FROM todo WHERE todo.user_id = user.id);
+#   CREATE UNIQUE INDEX ix_user_username ON user (username);
+#   CREATE INDEX ix_todo_user_id_id ON todo (user_id, id);
+#   CREATE INDEX ix_todo_user_id_is_done ON todo (user_id, is_done);
+#   CREATE INDEX ix_todo_user_id_seq ON todo (user_id, seq);
+#   CREATE FULLTEXT INDEX ix_todo_contents_fulltext ON todo (contents);
+# username이 중복된 row가 있으면 unique index 생성이 실패하므로 먼저 정리해야 함
+
+
+# 컬럼 추가 후 기존 row 값 채우기 (순서대로 실행, 추가된 컬럼만)
+# 기존 todo는 id를 변경 번호로 사용 (유저별로 증가), 유저의 todo_seq는 그 최대값부터 이어서 발급
+BACKFILL: dict[str, Callable[[], object]] = {
+    "todo.seq": lambda: update(ToDo.__table__).values(seq=ToDo.__table__.c.id),
+    "todo.updated_at": lambda: update(ToDo.__table__).values(updated_at=func.now()),
+    "user.todo_seq": lambda: update(User.__table__).values(
+        todo_seq=select(func.coalesce(func.max(ToDo.__table__.c.seq), 0))
+        .where(ToDo.__table__.c.user_id == User.__table__.c.id)
+        .scalar_subquery()
+    ),
+}
+
+
+def missing_columns(engine: Engine) -> list[Column]:
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in tables:
+            continue # 테이블이 없으면 create_all 대상
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        missing += [column for column in table.columns if column.name not in existing]
+    return missing
+
+
+def _add_columns(conn: Connection, columns: list[Column]) -> None:
+    # ADD COLUMN은 NOT NULL이면 server_default가 있어야 함 (orm.py의 seq, todo_seq)
+    preparer = conn.dialect.identifier_preparer
+    for column in columns:
+        logger.info("adding column %s.%s", column.table.name, column.name)
+        conn.execute(text(
+            f"ALTER TABLE {preparer.format_table(column.table)} "
+            f"ADD COLUMN {CreateColumn(column).compile(dialect=conn.dialect)}"
+        ))
+    added = {f"{column.table.name}.{column.name}" for column in columns}
+    for name, statement in BACKFILL.items():
+        if name in added:
+            conn.execute(statement())
+
+
+def required_indexes() -> list[Index]:
+    return [index for table in Base.metadata.sorted_tables for index in table.indexes]
+
+
+def _covered(index: Index, existing: list[tuple[tuple[str, ...], bool]]) -> bool:
+    # 이름이 달라도 같은 컬럼으로 시작하는 인덱스가 있으면 충분 (unique는 컬럼이 정확히 같아야 함)
+    columns = tuple(column.name for column in index.columns)
+    for existing_columns, unique in existing:
+        if index.unique:
+            if unique and existing_columns == columns:
+                return True
+        elif existing_columns[:len(columns)] == columns:
+            return True
+    return False
+
+
+def missing_indexes(engine: Engine) -> list[Index]:
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    missing = []
+    for index in required_indexes():
+        if index.table.name not in tables:
+            continue # 테이블이 없으면 create_all 대상
+        existing = [
+            (tuple(ix["column_names"]), bool(ix["unique"])) for ix in inspector.get_indexes(index.table.name)
+        ] + [
+            (tuple(uc["column_names"]), True) for uc in inspector.get_unique_constraints(index.table.name)
+        ] + [
+            # id = Column(..., primary_key=True, index=True)는 primary key로 충분
+            (tuple(inspector.get_pk_constraint(index.table.name)["constrained_columns"]), True)
+        ]
+        if not _covered(index, existing):
+            missing.append(index)
+    return missing
+
+
+def missing_search_index(engine: Engine) -> bool:
+    # orm.TODO_SEARCH_DDL (sqlite: FTS5 table + trigger, mysql: FULLTEXT index)
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    if engine.dialect.name not in TODO_SEARCH_DDL or "todo" not in tables:
+        return False
+    if engine.dialect.name == "sqlite":
+        return "todo_fts" not in tables
+    return "ix_todo_contents_fulltext" not in {index["name"] for index in inspector.get_indexes("todo")}
+
+
+def migrate(engine: Engine) -> list[Column | Index]:
+    # 없는 컬럼, 인덱스만 생성, 여러 번 실행해도 안전 (컬럼을 먼저 추가해야 새 컬럼의 인덱스 생성 가능)
+    columns = missing_columns(engine)
+    if columns:
+        with engine.begin() as conn:
+            _add_columns(conn, columns)
+    created = missing_indexes(engine)
+    for index in created:
+        logger.info("creating index %s on %s", index.name, index.table.name)
+        index.create(bind=engine, checkfirst=True)
+    if missing_search_index(engine):
+        logger.info("creating todo search index")
+        with engine.begin() as conn:
+            for statement in TODO_SEARCH_DDL[engine.dialect.name]:
+                conn.execute(text(statement))
+    return columns + created
+
+
+def check_schema(engine: Engine) -> list[Column | Index]:
+    # 서버 시작 시 호출: 컬럼, 인덱스가 빠져 있으면 warning만 남기고 계속 실행
+    try:
+        columns = missing_columns(engine)
+        missing = missing_indexes(engine)
+        search_index = missing_search_index(engine)
+    except Exception:
+        logger.warning("could not verify database schema", exc_info=True)
+        return []
+    for column in columns:
+        logger.warning(
+            "missing column %s.%s, run `python -m database.migrations`", column.table.name, column.name,
+        )
+    for index in missing:
+        logger.warning(
+            "missing index %s on %s (%s), run `python -m database.migrations`",
+            index.name, index.table.name, ", ".join(column.name for column in index.columns),
+        )
+    if search_index:
+        logger.warning("missing todo search index, run `python -m database.migrations`")
+    return columns + missing
+
+
+if __name__ == "__main__":
+    from database.connection import get_database
+
+    logging.basicConfig(level=logging.INFO)
+    migrate(get_database().engine)
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String, ForeignKey
+from sqlalchemy import DDL, Boolean, Column, DateTime, Index, Integer, String, ForeignKey, event, func
 from sqlalchemy.orm import declarative_base, relationship
 
 from schema.request import CreateToDoRequest
@@ -7,11 +7,23 @@ Base = declarative_base() # 배이스 클래스 생성
 
 class ToDo(Base): # mysql에서 생성한 동일한 테이블 구조
     __tablename__ = "todo"
+    __table_args__ = (
+        # 유저별 목록/keyset pagination(WHERE user_id = ? AND id > ? ORDER BY id), export
+        Index("ix_todo_user_id_id", "user_id", "id"),
+        # 유저별 완료/미완료 집계, 필터
+        Index("ix_todo_user_id_is_done", "user_id", "is_done"),
+        # 변경분 조회(WHERE user_id = ? AND seq > ? ORDER BY seq), GET /todos/changes
+        Index("ix_todo_user_id_seq", "user_id", "seq"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     contents = Column(String(256), nullable=False)
     is_done = Column(Boolean, nullable=False)
     user_id = Column(Integer, ForeignKey("user.id")) # 외래 키 추가
+    # 변경 추적: 생성/수정/삭제마다 유저의 User.todo_seq에서 새 번호를 받음 (유저 없는 todo는 0)
+    seq = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime, default=func.now(), onupdate=func.now())
+    deleted_at = Column(DateTime, nullable=True) # soft delete, 변경분 조회에서 삭제를 전달하기 위해 row 유지
     
     def __repr__(self): # 내부 정보 출력, 확인위해
         return f"ToDo(id={self.id}, contents={self.contents}, is_done={self.is_done})"
@@ -34,15 +46,48 @@ class ToDo(Base): # mysql에서 생성한 동일한 테이블 구조
 
 class User(Base):
     __tablename__ = "user"
+    __table_args__ = (
+        # 로그인, 인증된 요청마다 username으로 조회 (full scan 방지 + 중복 가입 방지)
+        Index("ix_user_username", "username", unique=True),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String(256), nullable=False)
     password = Column(String(256), nullable=False)
-    todos = relationship("ToDo", lazy="joined") # 컬럼이 생성되는 것이 아니라 쿼리가 실행될 때 조인된 결과를 가져옴
+    todo_seq = Column(Integer, nullable=False, default=0, server_default="0") # 마지막으로 발급한 todo 변경 번호
+    # 컬럼이 생성되는 것이 아니라 접근할 때 조회됨
+    # joined로 두면 유저 조회(로그인, 인증)마다 모든 todo를 함께 가져오므로 select(lazy load)로 변경
+    todos = relationship("ToDo", lazy="select")
 
     @classmethod
     def create(cls, username: str, hashed_password: str) -> "User":
         return cls(
             username=username,
             password=hashed_password
-        )
\ No newline at end of file
+        )
+
+
+# todo 내용 전문 검색 인덱스 (GET /todos/search, database/search.py)
+# - SQLite: FTS5 external content table, todo INSERT/UPDATE/DELETE trigger가 같은 트랜잭션에서 갱신
+#   (soft delete된 todo는 row가 남아 있으므로 검색시 todo와 join해서 제외)
+# - MySQL: InnoDB FULLTEXT index (쓰기마다 엔진이 갱신)
+# 테이블 생성시 함께 생성, 이미 있는 테이블은 python -m database.migrations
+TODO_SEARCH_DDL: dict[str, list[str]] = {
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS todo_fts USING fts5(contents, content='todo', content_rowid='id')",
+        "CREATE TRIGGER IF NOT EXISTS todo_fts_ai AFTER INSERT ON todo BEGIN "
+        "INSERT INTO todo_fts (rowid, contents) VALUES (new.id, new.contents); END",
+        "CREATE TRIGGER IF NOT EXISTS todo_fts_ad AFTER DELETE ON todo BEGIN "
+        "INSERT INTO todo_fts (todo_fts, rowid, contents) VALUES ('delete', old.id, old.contents); END",
+        "CREATE TRIGGER IF NOT EXISTS todo_fts_au AFTER UPDATE OF contents ON todo BEGIN "
+        "INSERT INTO todo_fts (todo_fts, rowid, contents) VALUES ('delete', old.id, old.contents); "
+        "INSERT INTO todo_fts (rowid, contents) VALUES (new.id, new.contents); END",
+        "INSERT INTO todo_fts (todo_fts) VALUES ('rebuild')", # 기존 row 색인
+    ],
+    "mysql": ["CREATE FULLTEXT INDEX ix_todo_contents_fulltext ON todo (contents)"],
+}
+
+for _dialect, _statements in TODO_SEARCH_DDL.items():
+    for _statement in _statements:
+        event.listen(ToDo.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+event.listen(ToDo.__table__, "before_drop", DDL("DROP TABLE IF EXISTS todo_fts").execute_if(dialect="sqlite"))
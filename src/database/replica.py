@@ -0,0 +1,104 @@
+import math
+import time
+from contextvars import ContextVar
+from http.cookies import SimpleCookie
+
+from sqlalchemy import Engine, Executable
+from sqlalchemy.orm import Session
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+# read replica 라우팅
+# - 읽기 전용 쿼리는 stmt.execution_options(read_replica=True)로 표시 -> replica 엔진
+# - 표시가 없는 쿼리, INSERT/UPDATE/DELETE, flush -> primary 엔진
+# - read-your-writes: 같은 클라이언트가 방금 쓴 데이터를 replica 복제 지연 때문에 못 읽는 일이 없도록
+#   쓰기 이후 일정 시간(cookie)과 같은 session 안에서는 읽기도 primary로 보냄
+# - 캐시 버전(cache.ToDoCache)과 함께 쓰는 읽기(캐시 저장, ETag)는 replica가 버전에 반영된 변경까지 복제된 경우에만 사용
+#   버전은 쓰기 commit 이후에 올라가므로 복제 지연된 replica의 이전 데이터가 새 버전 키에 저장되면
+#   모든 유저가 todo_cache_ttl 동안(ETag는 다음 쓰기까지) 이전 데이터를 받음
+#   -> 버전과 함께 가장 큰 변경 번호(seq)를 기록하고, replica에서 읽은 seq가 그보다 작으면 primary에서 다시 읽음
+#   (GET /todos, /todos/{todo_id}, ToDoRepository.get_todo_rows_by_user, get_todo_by_todo_id)
+#   검색은 결과에 seq가 없으므로 primary
+
+STICKY_COOKIE = "db_primary_until"
+
+
+class ReadYourWrites:
+    # 요청 하나 동안의 라우팅 상태 (threadpool/greenlet에서도 같은 객체를 공유하도록 mutable 객체로 둠)
+    def __init__(self, sticky: bool = False):
+        self.sticky: bool = sticky # 최근에 쓰기를 한 클라이언트 -> 읽기도 primary
+        self.wrote: bool = False # 이번 요청에서 쓰기 발생 -> 응답에 cookie 설정
+
+
+read_your_writes: ContextVar[ReadYourWrites | None] = ContextVar("read_your_writes", default=None)
+
+
+def read_replica(stmt: Executable) -> Executable:
+    return stmt.execution_options(read_replica=True)
+
+
+class RoutingSession(Session):
+    # sessionmaker(class_=RoutingSession, primary=..., replica=...)
+    # async는 async_sessionmaker(sync_session_class=RoutingSession, ...)에 sync_engine을 전달
+    def __init__(self, *args, primary: Engine, replica: Engine, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.primary = primary
+        self.replica = replica
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        state = read_your_writes.get()
+        if self._flushing or getattr(clause, "is_dml", False):
+            self.info["wrote"] = True
+            if state is not None:
+                state.wrote = True
+            return self.primary
+
+        use_replica = (
+            clause is not None
+            and clause.get_execution_options().get("read_replica", False)
+            and not self.info.get("wrote") # 같은 session에서 쓴 뒤의 읽기 (ex. MySQL UPDATE 후 SELECT)
+            and not (state is not None and (state.sticky or state.wrote))
+        )
+        return self.replica if use_replica else self.primary
+
+
+class ReadYourWritesMiddleware:
+    # 쓰기가 있었던 응답에 cookie(만료 시각)를 내려주고, cookie가 유효한 동안 그 클라이언트의 읽기는 primary로
+    def __init__(self, app: ASGIApp, sticky_seconds: float):
+        self.app = app
+        self.sticky_seconds = sticky_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        state = ReadYourWrites(sticky=self._is_sticky(scope))
+        token = read_your_writes.set(state)
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and state.wrote:
+                ttl = self.sticky_seconds
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Set-Cookie",
+                    f"{STICKY_COOKIE}={time.time() + ttl:.3f}; Max-Age={math.ceil(ttl)}; Path=/; HttpOnly; SameSite=Lax",
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            read_your_writes.reset(token)
+
+    @staticmethod
+    def _is_sticky(scope: Scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == b"cookie":
+                morsel = SimpleCookie(value.decode("latin-1")).get(STICKY_COOKIE)
+                try:
+                    return morsel is not None and float(morsel.value) > time.time()
+                except ValueError:
+                    return False
+        return False
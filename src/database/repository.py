@@ -1,39 +1,329 @@
 # 데이터를 조회하는 함수를 여기에 정의
 
-from sqlalchemy import select, delete
+from collections import Counter
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+from sqlalchemy import ColumnElement, Select, and_, case, func, inspect, or_, select, insert, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
 
 from database.orm import ToDo
-from typing import List
+from typing import AsyncIterator, Iterator, List
 from fastapi import Depends
-from database.connection import get_db
+from database.connection import get_db, get_session
+from database.replica import read_replica
+from database.search import search_query, search_terms
 from database.orm import User
+from todo_events import dispatch, todo_event
 
 class ToDoRepository:
     def __init__(self, session: Session = Depends(get_db)): # dependency injection 추가가
         self.session = session
 
+    # 삭제는 soft delete (deleted_at), 변경분 조회(get_changes_by_user) 외의 조회는 삭제된 todo 제외
     def get_todos(self) -> List[ToDo]:
-        return list(self.session.scalars(select(ToDo)))
+        return list(self.session.scalars(read_replica(select(ToDo).where(ToDo.deleted_at.is_(None)))))
+
+    # 캐시 버전(ETag)과 함께 응답하는 조회: min_seq = 버전에 반영된 변경 번호 (cache.ToDoCache)
+    # replica에서 읽은 데이터의 seq가 min_seq 이상이면 그대로 사용, 작으면(복제 지연) primary에서 다시 읽음
+    # min_seq가 없으면(버전 없음, 유저 없는 todo는 seq가 항상 0) primary
+    def get_todo_by_todo_id(self, todo_id: int, min_seq: int | None = None) -> ToDo | None:
+        stmt = select(ToDo).where(ToDo.id == todo_id)
+        if min_seq:
+            # 삭제된 row도 조회해서 삭제가 복제되었는지 확인
+            todo: ToDo | None = self.session.scalar(read_replica(stmt))
+            if todo is not None and todo.seq >= min_seq:
+                return todo if todo.deleted_at is None else None
+        # replica에서 읽은 객체가 session에 있으면 primary 값으로 덮어씀
+        return self.session.scalar(
+            stmt.where(ToDo.deleted_at.is_(None)).execution_options(populate_existing=True)
+        )
+
+    def get_todos_by_user(
+        self, user_id: int, limit: int, cursor: int | None = None, desc: bool = False
+    ) -> List[ToDo]:
+        # keyset pagination: (user_id, id) 기준으로 cursor 이후의 limit개만 DB에서 정렬해서 조회
+        # OFFSET과 달리 앞 페이지를 건너뛰는 비용이 없어서 페이지 위치와 상관없이 응답시간이 일정
+        stmt = select(ToDo).where(ToDo.user_id == user_id, ToDo.deleted_at.is_(None))
+        if cursor is not None:
+            stmt = stmt.where(ToDo.id < cursor if desc else ToDo.id > cursor)
+        stmt = stmt.order_by(ToDo.id.desc() if desc else ToDo.id).limit(limit)
+        return list(self.session.scalars(read_replica(stmt)))
+
+    @staticmethod
+    def todo_rows_query(user_id: int) -> Select:
+        return read_replica(
+            select(ToDo.id, ToDo.contents, ToDo.is_done)
+            .where(ToDo.user_id == user_id, ToDo.deleted_at.is_(None))
+            .order_by(ToDo.id)
+        )
+
+    def get_todo_rows_by_user(
+        self, user_id: int, limit: int, cursor: int | None = None, desc: bool = False, min_seq: int | None = None
+    ) -> tuple[int, List[tuple[int, str, bool]]]:
+        # get_todos_by_user와 같은 조회, ORM 객체 대신 (id, contents, is_done) tuple
+        # + 같은 쿼리에서 읽은 유저의 todo_seq (조회한 데이터에 반영된 변경 번호), (todo_seq, rows)
+        # user LEFT JOIN todo: todo가 없어도 todo_seq는 조회됨 (todo 컬럼이 NULL인 row 하나)
+        condition = [ToDo.user_id == User.id, ToDo.deleted_at.is_(None)]
+        if cursor is not None:
+            condition.append(ToDo.id < cursor if desc else ToDo.id > cursor)
+        stmt = (
+            select(User.todo_seq, ToDo.id, ToDo.contents, ToDo.is_done)
+            .outerjoin(ToDo, and_(*condition))
+            .where(User.id == user_id)
+            .order_by(ToDo.id.desc() if desc else ToDo.id)
+            .limit(limit)
+        )
+        rows = self.session.execute(read_replica(stmt)).all() if min_seq else []
+        if not rows or rows[0][0] < min_seq:
+            rows = self.session.execute(stmt).all()
+        seq: int = rows[0][0] if rows else 0
+        return seq, [tuple(row[1:]) for row in rows if row[1] is not None]
+
+    def iter_todo_rows_by_user(
+        self, user_id: int, batch_size: int
+    ) -> Iterator[List[tuple[int, str, bool]]]:
+        # server-side cursor(yield_per)로 batch_size개씩 가져와서 전달
+        # 전체 결과를 메모리에 올리지 않으므로 row 수와 상관없이 메모리 사용량이 일정
+        result = self.session.execute(
+            self.todo_rows_query(user_id).execution_options(yield_per=batch_size)
+        )
+        for partition in result.partitions():
+            yield [tuple(row) for row in partition]
+
+    def get_changes_by_user(
+        self, user_id: int, since: int, limit: int
+    ) -> List[tuple[int, str, bool, int, datetime | None, datetime | None]]:
+        # since 이후에 생성/수정/삭제된 todo를 seq 순서로 (id, contents, is_done, seq, updated_at, deleted_at)
+        # (user_id, seq) 인덱스 range scan -> 비용은 유저의 전체 todo 수가 아니라 변경된 row 수에 비례
+        stmt = (
+            select(ToDo.id, ToDo.contents, ToDo.is_done, ToDo.seq, ToDo.updated_at, ToDo.deleted_at)
+            .where(ToDo.user_id == user_id, ToDo.seq > since)
+            .order_by(ToDo.seq)
+            .limit(limit)
+        )
+        return [tuple(row) for row in self.session.execute(read_replica(stmt))]
 
-    def get_todo_by_todo_id(self, todo_id: int) -> ToDo | None:
-        return self.session.scalar(select(ToDo).where(ToDo.id == todo_id))
+    def search_todos(
+        self, user_id: int, query: str, limit: int, offset: int = 0
+    ) -> List[tuple[int, str, bool]]:
+        # 전문 검색 인덱스(FTS5, FULLTEXT)로 관련도 순 (id, contents, is_done), database/search.py
+        # primary: 결과를 유저 캐시 버전에 저장하므로 (database/replica.py)
+        terms: list[str] = search_terms(query)
+        if not terms:
+            return []
+        stmt = search_query(self._dialect.name, user_id, terms).limit(limit).offset(offset)
+        return [tuple(row) for row in self.session.execute(stmt)]
+
+    def lock_todo_counts(self, user_id: int) -> tuple[int, int, int]:
+        # (user.todo_seq, 전체 수, 완료 수), stats.py의 reconcile
+        # user row lock(SELECT ... FOR UPDATE)을 잡고 집계, commit/rollback 전까지 이 유저의 쓰기(seq 예약)는 대기
+        # -> 집계에 포함된 쓰기는 seq <= 반환한 seq, 이후 쓰기는 > seq (sqlite는 FOR UPDATE 미지원)
+        seq: int | None = self.session.scalar(
+            select(User.todo_seq).where(User.id == user_id).with_for_update()
+        )
+        counts: dict[bool, int] = dict(self.session.execute(
+            select(ToDo.is_done, func.count())
+            .where(ToDo.user_id == user_id, ToDo.deleted_at.is_(None))
+            .group_by(ToDo.user_id, ToDo.is_done)
+        ).all())
+        return seq or 0, sum(counts.values()), counts.get(True, 0)
+
+    # 변경 번호(seq): 쓰기마다 user.todo_seq를 증가시켜 예약하고 변경된 todo에 기록
+    # user row UPDATE의 row lock이 commit까지 유지되므로 같은 유저의 쓰기는 seq 순서대로 commit 됨
+    # -> 작은 seq의 변경이 나중에 보이는 일이 없어서 since 이후 조회로 변경을 놓치지 않음
+    def _reserve_seq(self, user_id: int | ColumnElement, count: int) -> int | None:
+        # count개를 예약하고 첫 번호 반환, 유저가 없으면 None
+        stmt = (
+            update(User).where(User.id == user_id)
+            .values(todo_seq=User.todo_seq + count)
+            .execution_options(synchronize_session=False)
+        )
+        if self._dialect.update_returning:
+            last: int | None = self.session.scalar(stmt.returning(User.todo_seq))
+        else:
+            if self.session.execute(stmt).rowcount == 0:
+                return None
+            last = self.session.scalar(select(User.todo_seq).where(User.id == user_id))
+        return last - count + 1 if last is not None else None
+
+    def _assign_seqs(self, todos: List[ToDo]) -> None:
+        # 유저별로 한번에 예약해서 입력 순서대로 부여, 유저 없는 todo는 0
+        next_seq: dict[int, int | None] = {
+            user_id: self._reserve_seq(user_id, count)
+            for user_id, count in Counter(todo.user_id for todo in todos if todo.user_id is not None).items()
+        }
+        for todo in todos:
+            seq: int | None = next_seq.get(todo.user_id)
+            todo.seq = seq or 0
+            if seq:
+                next_seq[todo.user_id] = seq + 1
+
+    def _reserve_seqs(self, user_id: int, todo_ids: List[int]) -> dict[int, int]:
+        # bulk 수정/삭제: 요청한 id 수만큼 한번에 예약 (없는 id의 번호는 건너뜀, 번호는 증가만 하면 됨)
+        first: int | None = self._reserve_seq(user_id, len(todo_ids))
+        return {todo_id: first + i for i, todo_id in enumerate(todo_ids)} if first else {}
+
+    @staticmethod
+    def _seq_case(seqs: dict[int, int]) -> ColumnElement:
+        # UPDATE ... SET seq = CASE id WHEN ... THEN ... END
+        return case(seqs, value=ToDo.id) if seqs else ToDo.seq
 
     def create_todo(self, todo: ToDo) -> ToDo:
+        self._assign_seqs([todo])
         self.session.add(instance=todo)
         self.session.commit() # db에저장
         self.session.refresh(instance=todo) # 데이터를 다시 읽어주는 부분(db read), 이때 todo_id 값이 반영되서 저장됨
         return todo # id가 포함된 todo를 리턴
 
-    def update_todo(self, todo: ToDo) -> ToDo:
+    def update_todo(self, todo: ToDo) -> tuple[ToDo, bool]:
+        # (todo, 변경 전 is_done)
+        history = inspect(todo).attrs.is_done.history
+        was_done: bool = history.deleted[0] if history.deleted else todo.is_done
+        self._assign_seqs([todo])
         self.session.add(instance=todo)
         self.session.commit() 
         self.session.refresh(instance=todo) 
-        return todo 
+        return todo, was_done
+
+    def _update_todo(
+        self, todo_id: int, changes: ColumnElement | None = None, **values
+    ) -> tuple[ToDo | None, bool]:
+        # 삭제되지 않은 todo 하나를 SELECT 없이 UPDATE, (todo, 변경 여부), 없는 todo면 (None, False)
+        # RETURNING 지원 dialect(sqlite, mariadb, postgresql)는 갱신된 row를 바로 받아서 refresh 생략
+        condition = (ToDo.id == todo_id, ToDo.deleted_at.is_(None))
+        seq: int | None = self._reserve_seq(select(ToDo.user_id).where(*condition).scalar_subquery(), 1)
+        stmt = update(ToDo).where(*condition).values(**values, **self._if_changed(changes, seq or ToDo.seq))
+        if self._dialect.update_returning:
+            todo: ToDo | None = self.session.scalar(stmt.returning(ToDo))
+        else:
+            # MySQL: rowcount는 매칭된 row 수 (sqlalchemy가 CLIENT_FOUND_ROWS 사용)
+            matched: bool = self.session.execute(stmt).rowcount > 0
+            todo = self.session.scalar(select(ToDo).where(ToDo.id == todo_id)) if matched else None
+        self.session.commit()
+        return todo, todo is not None and (seq is None or todo.seq == seq)
+
+    @staticmethod
+    def _if_changed(changes: ColumnElement | None, seq: ColumnElement | int) -> dict:
+        # changes(ex. is_done != 새 값)가 참인 row만 seq, updated_at 갱신
+        # 예약한 seq는 다른 row에 없는 번호이므로 UPDATE 결과의 seq가 예약한 번호면 실제로 바뀐 row
+        # -> 이전 값 조회 없이 변경 여부를 알 수 있음 (같은 값으로의 수정은 변경 이벤트, 캐시 무효화, 통계 반영 X)
+        if changes is None:
+            return {"seq": seq}
+        return {
+            "seq": case((changes, seq), else_=ToDo.seq),
+            "updated_at": case((changes, func.now()), else_=ToDo.updated_at),
+        }
 
-    def delete_todo(self, todo_id: int) -> None:
-        self.session.execute(delete(ToDo).where(ToDo.id == todo_id))
+    def update_todo_is_done(self, todo_id: int, is_done: bool) -> tuple[ToDo | None, bool]:
+        return self._update_todo(todo_id, ToDo.is_done != is_done, is_done=is_done)
+
+    def delete_todo(self, todo_id: int) -> ToDo | None:
+        # soft delete: deleted_at 기록, 삭제된 todo(없으면 None) 반환
+        todo, _ = self._update_todo(todo_id, deleted_at=func.now())
+        return todo
+
+    # bulk: 여러 todo를 하나의 트랜잭션, 최소한의 statement로 처리
+    @property
+    def _dialect(self):
+        return self.session.get_bind().dialect
+
+    def create_todos(self, todos: List[ToDo]) -> List[ToDo]:
+        self._assign_seqs(todos)
+        rows = [
+            {"contents": todo.contents, "is_done": todo.is_done, "user_id": todo.user_id, "seq": todo.seq}
+            for todo in todos
+        ]
+        if self._dialect.insert_executemany_returning:
+            # INSERT ... VALUES (...), (...) RETURNING (sqlalchemy insertmanyvalues)
+            # sort_by_parameter_order=True는 sentinel 컬럼이 없으면 (sqlite) row마다 INSERT로 바뀌므로
+            # 한 INSERT 안에서 증가하는 id 순서로 정렬해 입력 순서를 맞춤 (MySQL 경로와 같은 가정)
+            created = sorted(
+                self.session.scalars(insert(ToDo).returning(ToDo), rows), key=lambda todo: todo.id
+            )
+        else:
+            created = self._insert_todos_without_returning(rows)
+        self.session.commit()
+        return created
+
+    def _insert_todos_without_returning(self, rows: List[dict]) -> List[ToDo]:
+        # MySQL: RETURNING이 없으므로 multi-row INSERT 후 예약한 (user_id, seq) 범위로 다시 조회
+        # auto increment 값이 연속이라는 가정(lastrowid + i)은 auto_increment_increment > 1,
+        # innodb_autoinc_lock_mode=2(동시 INSERT)에서 틀림, seq는 유저별로 정확히 예약한 번호
+        seq_ranges: dict[int, tuple[int, int]] = {}
+        for row in rows:
+            if row["seq"]:
+                first, last = seq_ranges.get(row["user_id"], (row["seq"], row["seq"]))
+                seq_ranges[row["user_id"]] = (min(first, row["seq"]), max(last, row["seq"]))
+
+        by_seq: dict[tuple[int, int], ToDo] = {}
+        if seq_ranges:
+            self.session.execute(insert(ToDo).values([row for row in rows if row["seq"]]))
+            by_seq = {
+                (todo.user_id, todo.seq): todo
+                for todo in self.session.scalars(
+                    select(ToDo).where(or_(*(
+                        and_(ToDo.user_id == user_id, ToDo.seq.between(first, last))
+                        for user_id, (first, last) in seq_ranges.items()
+                    )))
+                )
+            }
+
+        created: List[ToDo] = []
+        for row in rows:
+            if row["seq"]:
+                created.append(by_seq[(row["user_id"], row["seq"])])
+            else:
+                # seq가 없는(유저 없는) todo는 row마다 INSERT, 단일 row의 lastrowid는 정확함
+                result = self.session.execute(insert(ToDo).values(row))
+                created.append(ToDo(id=result.inserted_primary_key[0], **row))
+        return created
+
+    def update_todos(self, user_id: int, is_done_by_id: dict[int, bool]) -> tuple[List[ToDo], List[ToDo]]:
+        # (요청한 todo 중 존재하는 todo, 그 중 is_done이 바뀐 todo)
+        # is_done 값별로 UPDATE ... WHERE id IN (...) 한번씩 (최대 2번)
+        seqs: dict[int, int] = self._reserve_seqs(user_id, list(is_done_by_id))
+        condition = (ToDo.user_id == user_id, ToDo.deleted_at.is_(None))
+        todos: List[ToDo] = []
+        for is_done in (True, False):
+            todo_ids = [todo_id for todo_id, value in is_done_by_id.items() if value is is_done]
+            if not todo_ids:
+                continue
+            stmt = (
+                update(ToDo)
+                .where(*condition, ToDo.id.in_(todo_ids))
+                .values(is_done=is_done, **self._if_changed(ToDo.is_done != is_done, self._seq_case(seqs)))
+            )
+            if self._dialect.update_returning:
+                todos += self.session.scalars(stmt.returning(ToDo))
+            else:
+                self.session.execute(stmt)
+
+        if not self._dialect.update_returning:
+            todos = list(self.session.scalars(select(ToDo).where(*condition, ToDo.id.in_(is_done_by_id))))
+        self.session.commit()
+        return todos, [todo for todo in todos if todo.seq == seqs.get(todo.id)]
+
+    def delete_todos(self, user_id: int, todo_ids: List[int]) -> List[ToDo]:
+        # soft delete, 삭제된 todo 반환
+        condition = (ToDo.user_id == user_id, ToDo.id.in_(todo_ids), ToDo.deleted_at.is_(None))
+        seqs: dict[int, int] = self._reserve_seqs(user_id, todo_ids)
+        stmt = update(ToDo).where(*condition).values(deleted_at=func.now(), seq=self._seq_case(seqs))
+        if self._dialect.update_returning:
+            deleted = list(self.session.scalars(stmt.returning(ToDo)))
+        else:
+            rows = self.session.execute(
+                select(ToDo.id, ToDo.contents, ToDo.is_done).where(*condition).with_for_update()
+            ).all()
+            self.session.execute(stmt.execution_options(synchronize_session=False))
+            deleted = [
+                ToDo(id=todo_id, contents=contents, is_done=is_done, user_id=user_id, seq=seqs.get(todo_id, 0))
+                for todo_id, contents, is_done in rows
+            ]
         self.session.commit()
+        return deleted
         
 
 class UserRepository:
@@ -42,11 +332,161 @@ class UserRepository:
         
     def get_user_by_username(self, username: str) -> User | None:
         return self.session.scalar(
-            select(User).where(User.username == username)
+            read_replica(select(User).where(User.username == username))
             )
 
     def save_user(self, user: User) -> User:
         self.session.add(instance=user)
         self.session.commit()
         self.session.refresh(instance=user)
-        return user
\ No newline at end of file
+        return user
+
+    def update_password(self, user_id: int, hashed_password: str) -> None:
+        self.session.execute(
+            update(User).where(User.id == user_id).values(password=hashed_password)
+            )
+        self.session.commit()
+
+
+class _AsyncRepository:
+    # 동기 repository의 쿼리 로직을 그대로 재사용하는 async 버전
+    # - AsyncSession: run_sync로 greenlet 안에서 실행 -> I/O는 async 드라이버가 처리 (worker thread 점유 X)
+    # - Session(db_async=False): threadpool에서 실행 (기존 동기 경로)
+    repository_class: type
+
+    def __init__(self, session: AsyncSession | Session = Depends(get_session)):
+        self.session = session
+
+    async def _run(self, method: str, **kwargs):
+        if isinstance(self.session, AsyncSession):
+            return await self.session.run_sync(self._call, method, kwargs)
+        return await run_in_threadpool(self._call, self.session, method, kwargs)
+
+    def _call(self, session: Session, method: str, kwargs: dict):
+        return getattr(self.repository_class(session=session), method)(**kwargs)
+
+    async def _rollback(self) -> None:
+        if isinstance(self.session, AsyncSession):
+            await self.session.rollback()
+        else:
+            await run_in_threadpool(self.session.rollback)
+
+
+class AsyncToDoRepository(_AsyncRepository):
+    repository_class = ToDoRepository
+
+    async def get_todos(self) -> List[ToDo]:
+        return await self._run("get_todos")
+
+    async def get_todo_by_todo_id(self, todo_id: int, min_seq: int | None = None) -> ToDo | None:
+        return await self._run("get_todo_by_todo_id", todo_id=todo_id, min_seq=min_seq)
+
+    async def get_todos_by_user(
+        self, user_id: int, limit: int, cursor: int | None = None, desc: bool = False
+    ) -> List[ToDo]:
+        return await self._run(
+            "get_todos_by_user", user_id=user_id, limit=limit, cursor=cursor, desc=desc
+        )
+
+    async def get_todo_rows_by_user(
+        self, user_id: int, limit: int, cursor: int | None = None, desc: bool = False, min_seq: int | None = None
+    ) -> tuple[int, List[tuple[int, str, bool]]]:
+        return await self._run(
+            "get_todo_rows_by_user", user_id=user_id, limit=limit, cursor=cursor, desc=desc, min_seq=min_seq
+        )
+
+    async def get_changes_by_user(
+        self, user_id: int, since: int, limit: int
+    ) -> List[tuple[int, str, bool, int, datetime | None, datetime | None]]:
+        return await self._run("get_changes_by_user", user_id=user_id, since=since, limit=limit)
+
+    @asynccontextmanager
+    async def lock_todo_counts(self, user_id: int) -> AsyncIterator[tuple[int, int, int]]:
+        # 블록이 끝날 때 rollback(읽기만 했으므로)으로 lock 해제
+        try:
+            yield await self._run("lock_todo_counts", user_id=user_id)
+        finally:
+            await self._rollback()
+
+    async def search_todos(
+        self, user_id: int, query: str, limit: int, offset: int = 0
+    ) -> List[tuple[int, str, bool]]:
+        return await self._run("search_todos", user_id=user_id, query=query, limit=limit, offset=offset)
+
+    async def iter_todo_rows_by_user(
+        self, user_id: int, batch_size: int
+    ) -> AsyncIterator[List[tuple[int, str, bool]]]:
+        # generator는 run_sync로 감쌀 수 없으므로 AsyncSession.stream 사용
+        if isinstance(self.session, AsyncSession):
+            result = await self.session.stream(
+                self.repository_class.todo_rows_query(user_id).execution_options(yield_per=batch_size)
+            )
+            async for partition in result.partitions():
+                yield [tuple(row) for row in partition]
+            return
+
+        batches = self.repository_class(session=self.session).iter_todo_rows_by_user(
+            user_id=user_id, batch_size=batch_size
+        )
+        async for batch in iterate_in_threadpool(batches):
+            yield batch
+
+    # 쓰기 이후 해당 todo, 유저 목록의 캐시 버전을 올림 (cache.ToDoCache)
+    async def _after_write(self, type: str, todos: List[ToDo], was_done: List[bool | None] | None = None) -> None:
+        # commit 이후 변경 이벤트 dispatch -> 캐시 무효화, 변경 스트림 전송, 통계 (todo_events.py)
+        # was_done: todo별 변경 전 is_done (updated)
+        await dispatch([
+            todo_event(type, todo, was_done[i] if was_done else None) for i, todo in enumerate(todos)
+        ])
+
+    async def create_todo(self, todo: ToDo) -> ToDo:
+        todo = await self._run("create_todo", todo=todo)
+        await self._after_write("created", [todo])
+        return todo
+
+    async def update_todo(self, todo: ToDo) -> ToDo:
+        todo, was_done = await self._run("update_todo", todo=todo)
+        await self._after_write("updated", [todo], was_done=[was_done])
+        return todo
+
+    async def update_todo_is_done(self, todo_id: int, is_done: bool) -> ToDo | None:
+        todo, changed = await self._run("update_todo_is_done", todo_id=todo_id, is_done=is_done)
+        if changed:
+            await self._after_write("updated", [todo], was_done=[not is_done])
+        return todo
+
+    async def delete_todo(self, todo_id: int) -> ToDo | None:
+        todo: ToDo | None = await self._run("delete_todo", todo_id=todo_id)
+        if todo:
+            await self._after_write("deleted", [todo])
+        return todo
+
+    async def create_todos(self, todos: List[ToDo]) -> List[ToDo]:
+        todos = await self._run("create_todos", todos=todos)
+        await self._after_write("created", todos)
+        return todos
+
+    async def update_todos(self, user_id: int, is_done_by_id: dict[int, bool]) -> List[ToDo]:
+        todos, changed = await self._run(
+            "update_todos", user_id=user_id, is_done_by_id=is_done_by_id
+        )
+        await self._after_write("updated", changed, was_done=[not todo.is_done for todo in changed])
+        return todos
+
+    async def delete_todos(self, user_id: int, todo_ids: List[int]) -> List[int]:
+        deleted: List[ToDo] = await self._run("delete_todos", user_id=user_id, todo_ids=todo_ids)
+        await self._after_write("deleted", deleted)
+        return [todo.id for todo in deleted]
+
+
+class AsyncUserRepository(_AsyncRepository):
+    repository_class = UserRepository
+
+    async def get_user_by_username(self, username: str) -> User | None:
+        return await self._run("get_user_by_username", username=username)
+
+    async def save_user(self, user: User) -> User:
+        return await self._run("save_user", user=user)
+
+    async def update_password(self, user_id: int, hashed_password: str) -> None:
+        return await self._run("update_password", user_id=user_id, hashed_password=hashed_password)
@@ -0,0 +1,38 @@
+import re
+
+from sqlalchemy import Integer, Select, column, literal_column, or_, select, table
+from sqlalchemy.dialects.mysql import match
+
+from database.orm import ToDo
+
+# 전문 검색 쿼리 (인덱스는 orm.TODO_SEARCH_DDL)
+# 검색어는 단어 단위로 나눠서 하나라도 포함된 todo를 관련도 순으로 (MySQL natural language mode와 같은 의미)
+
+MAX_TERMS = 10
+
+todo_fts = table("todo_fts", column("rowid", Integer), column("rank"))
+
+
+def search_terms(query: str) -> list[str]:
+    # 따옴표, 연산자(AND, *, -) 등은 버리고 단어만 사용 -> 사용자 입력으로 MATCH 문법 오류가 나지 않음
+    return list(dict.fromkeys(re.findall(r"\w+", query.lower())))[:MAX_TERMS]
+
+
+def search_query(dialect: str, user_id: int, terms: list[str]) -> Select:
+    # 유저의 삭제되지 않은 todo 중 terms를 포함하는 (id, contents, is_done), 관련도 높은 순
+    stmt = select(ToDo.id, ToDo.contents, ToDo.is_done).where(
+        ToDo.user_id == user_id, ToDo.deleted_at.is_(None)
+    )
+    if dialect == "sqlite":
+        # FTS5: bm25 점수(rank, 작을수록 관련도 높음)
+        return (
+            stmt.join(todo_fts, todo_fts.c.rowid == ToDo.id)
+            .where(literal_column("todo_fts").op("MATCH")(" OR ".join(f'"{term}"' for term in terms)))
+            .order_by(todo_fts.c.rank, ToDo.id)
+        )
+    if dialect == "mysql":
+        # FULLTEXT: MATCH ... AGAINST (... IN NATURAL LANGUAGE MODE), 점수가 클수록 관련도 높음
+        relevance = match(ToDo.contents, against=" ".join(terms)).in_natural_language_mode()
+        return stmt.where(relevance > 0).order_by(relevance.desc(), ToDo.id)
+    # 검색 인덱스가 없는 dialect: LIKE (관련도 없이 id 순, 유저의 todo 전체를 읽음)
+    return stmt.where(or_(*(ToDo.contents.icontains(term, autoescape=True) for term in terms))).order_by(ToDo.id)
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+from functools import partial
+from typing import Any, Awaitable, Callable
+
+from fastapi import HTTPException
+
+from config import Settings, settings
+from service.user import UserService
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueue:
+    # in-process asyncio 작업 큐
+    # - worker task concurrency개가 최대 batch_size개씩 꺼내서 handler(batch) 실행
+    # - 실패시 retry_backoff * 2^n 초 대기 후 최대 max_retries번 재시도
+    # - stop()시 남은 작업을 처리(drain)한 뒤 종료
+    def __init__(
+        self,
+        handler: Callable[[list[Any]], Awaitable[None]],
+        concurrency: int,
+        batch_size: int,
+        max_retries: int,
+        retry_backoff: float,
+        maxsize: int,
+    ):
+        self.handler = handler
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.maxsize = maxsize
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.concurrency)
+        ]
+
+    async def stop(self, timeout: float) -> None:
+        if self._queue is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("job queue drain timed out, %d jobs dropped", self._queue.qsize())
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._queue, self._workers = None, []
+
+    def enqueue(self, item: Any) -> None:
+        if self._queue is None: # lifespan 밖에서 호출된 경우
+            self.start()
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            raise HTTPException(
+                status_code=503,
+                detail="Service Unavailable",
+                headers={"Retry-After": "1"},
+            )
+
+    def qsize(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def _worker(self) -> None:
+        while True:
+            batch: list[Any] = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await self._process(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _process(self, batch: list[Any]) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                await self.handler(batch)
+                return
+            except Exception:
+                if attempt == self.max_retries:
+                    logger.exception("job failed after %d attempts: %s", attempt + 1, batch)
+                    return
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+
+
+# app lifespan에서 settings로 생성, 시작/종료 (main.py)
+email_queue: JobQueue | None = None
+
+
+def init_email_queue(settings: Settings) -> JobQueue:
+    global email_queue
+    email_queue = JobQueue(
+        handler=partial(UserService.send_emails, delay=settings.email_send_delay),
+        concurrency=settings.email_concurrency,
+        batch_size=settings.email_batch_size,
+        max_retries=settings.email_max_retries,
+        retry_backoff=settings.email_retry_backoff,
+        maxsize=settings.email_queue_size,
+    )
+    return email_queue
+
+
+async def close_email_queue(timeout: float) -> None:
+    global email_queue
+    if email_queue is not None:
+        await email_queue.stop(timeout=timeout) # 남은 메일 전송 후 종료
+        email_queue = None
+
+
+def get_email_queue(settings: Settings = settings) -> JobQueue:
+    # lifespan 밖(스크립트, 테스트)에서 호출되어도 동작하도록 lazy init (enqueue가 worker 시작)
+    return email_queue or init_email_queue(settings)
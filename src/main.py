@@ -1,46 +1,70 @@
-from fastapi import Depends, FastAPI, Body, HTTPException
-from pydantic import BaseModel
-from sqlalchemy.orm import Session
-from database.connection import get_db
-#from database.repository import delete_todo, get_todo_by_todo_id, get_todos, create_todo, update_todo, delete_todo
-
-
-from database.orm import ToDo
-from typing import List
-
-from schema.request import CreateToDoRequest
-from schema.response import ToDoListSchema, ToDoSchema
-
-from api import todo, user
-
-
-app = FastAPI()
-app.include_router(todo.router)
-app.include_router(user.router)
-
-@app.get("/")
-def health_check_handler():
-    return {"ping": "pong"}
-
-
-# DB가 없으므로 메모리 데이터를 하나 만들자
-todo_data = {
-    1: {
-        "id": 1,
-        "contents": "실전! FastAPI 섹션 0 수강",
-        "is_done": True,
-    },
-    2: {
-        "id": 2,
-        "contents": "실전! FastAPI 섹션 1 수강",
-        "is_done": False,
-    },    
-    3: {
-        "id": 3,
-        "contents": "실전! FastAPI 섹션 2 수강",
-        "is_done": False,
-    },   
-}
+import logging
+from contextlib import asynccontextmanager
+from typing import Awaitable
+
+from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
+
+from api import events, health, todo, user
+from cache import close_redis, init_redis
+from concurrency import configure_threadpool
+from config import Settings, settings
+from database.connection import close_db, init_db
+from database.migrations import check_schema
+from database.replica import ReadYourWritesMiddleware
+from todo_events import close_broker, init_broker
+from jobs import close_email_queue, init_email_queue
+from metrics import MetricsMiddleware
+from security import init_token_cache
+from service.password import close_password_hasher, init_password_hasher
+
+logger = logging.getLogger(__name__)
+
+
+async def _warm_up(name: str, warm_up: Awaitable) -> None:
+    # 실패해도 서버는 시작 (커넥션은 첫 요청에서 다시 시도)
+    try:
+        await warm_up
+    except Exception:
+        logger.warning("%s warm-up failed", name, exc_info=True)
+
+
+def create_app(settings: Settings = settings) -> FastAPI:
+    # import 시점에는 엔진, redis client 등을 만들지 않음 -> lifespan에서 settings로 생성/종료
+    # (lifespan 없이 실행되는 테스트, 스크립트는 get_database/get_redis 등이 lazy init)
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        configure_threadpool(settings.threadpool_size)
+        database = init_db(settings) # 엔진, session factory 생성
+        redis_client = init_redis(settings) # redis connection pool 생성
+        init_token_cache(settings)
+        init_password_hasher(settings) # bcrypt 프로세스 풀은 첫 해싱 시점에 생성
+        init_broker(settings)
+        email_queue = init_email_queue(settings)
+        await _warm_up("db pool", database.warm_up(settings.db_pool_warmup)) # 커넥션 미리 열기
+        await _warm_up("redis", redis_client.ping())
+        await run_in_threadpool(check_schema, database.engine) # 인덱스 누락시 warning
+        email_queue.start()
+        yield
+        await close_broker() # 열린 변경 스트림(SSE) 종료
+        await close_email_queue(timeout=settings.email_drain_timeout) # 남은 메일 전송 후 종료
+        await close_redis()
+        await close_db() # connection pool 종료
+        close_password_hasher() # bcrypt 프로세스 풀 종료
+
+    app = FastAPI(lifespan=lifespan)
+    app.state.settings = settings
+    app.add_middleware(ReadYourWritesMiddleware, sticky_seconds=settings.replica_sticky_seconds)
+    app.add_middleware(MetricsMiddleware)
+    app.include_router(health.router)
+    app.include_router(events.router) # /todos/events가 /todos/{todo_id}보다 먼저 매칭되도록 todo보다 먼저
+    app.include_router(todo.router)
+    app.include_router(user.router)
+    return app
+
+
+app = create_app()
+
 
 # @app.get("/todos")
 # def get_todos_handler():
@@ -0,0 +1,168 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+# 요청 하나 동안 누적되는 값 (DB 쿼리 수/시간, redis 호출 시간, 구간별 시간)
+class RequestMetrics:
+    def __init__(self):
+        self.db_queries: int = 0
+        self.db_seconds: float = 0.0
+        self.redis_calls: int = 0
+        self.redis_seconds: float = 0.0
+        self.timings: dict[str, float] = {} # ex. jwt, serialize
+
+    def server_timing(self, total_seconds: float) -> str:
+        # Server-Timing 헤더 (브라우저 개발자도구 Network 탭에서 확인 가능), 단위 ms
+        entries = {
+            "db": self.db_seconds,
+            "redis": self.redis_seconds,
+            **self.timings,
+            "total": total_seconds,
+        }
+        timing = ", ".join(f"{name};dur={seconds * 1000:.2f}" for name, seconds in entries.items())
+        return f'{timing}, db_queries;desc="{self.db_queries}"'
+
+
+current_request: ContextVar[RequestMetrics | None] = ContextVar("current_request", default=None)
+
+
+def record_db_query(seconds: float) -> None:
+    # database/connection.py의 after_cursor_execute 이벤트에서 호출
+    metrics = current_request.get()
+    if metrics is not None:
+        metrics.db_queries += 1
+        metrics.db_seconds += seconds
+
+
+def record_redis_call(seconds: float) -> None:
+    # cache.InstrumentedRedis에서 호출
+    metrics = current_request.get()
+    if metrics is not None:
+        metrics.redis_calls += 1
+        metrics.redis_seconds += seconds
+
+
+@contextmanager
+def track(name: str) -> Iterator[None]:
+    # handler 안의 특정 구간 시간 측정 -> Server-Timing에 name으로 표시
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics = current_request.get()
+        if metrics is not None:
+            metrics.timings[name] = metrics.timings.get(name, 0.0) + time.perf_counter() - start
+
+
+# prometheus text format (prometheus_client 의존성 없이 필요한 만큼만 구현)
+class Histogram:
+    def __init__(self, name: str, help: str, labels: tuple[str, ...], buckets: tuple[float, ...]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        self._series: dict[tuple[str, ...], list] = {} # labels -> [bucket counts, sum, count]
+
+    def observe(self, labels: tuple[str, ...], value: float) -> None:
+        series = self._series.setdefault(labels, [[0] * len(self.buckets), 0.0, 0])
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[0][i] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (bucket_counts, total, count) in sorted(self._series.items()):
+            label = ",".join(f'{k}="{v}"' for k, v in zip(self.labels, labels))
+            for bound, bucket_count in zip(self.buckets, bucket_counts):
+                lines.append(f'{self.name}_bucket{{{label},le="{bound}"}} {bucket_count}')
+            lines.append(f'{self.name}_bucket{{{label},le="+Inf"}} {count}')
+            lines.append(f"{self.name}_sum{{{label}}} {total}")
+            lines.append(f"{self.name}_count{{{label}}} {count}")
+        return lines
+
+
+class Gauge:
+    # 값을 저장하지 않고 /metrics 조회 시점에 fn()으로 읽음 (labels -> value)
+    def __init__(self, name: str, help: str, labels: tuple[str, ...], fn: Callable[[], dict]):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.fn = fn
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge"]
+        for labels, value in sorted(self.fn().items()):
+            label = ",".join(f'{k}="{v}"' for k, v in zip(self.labels, labels))
+            lines.append(f"{self.name}{{{label}}} {value}")
+        return lines
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "Request latency", ("method", "route", "status"), LATENCY_BUCKETS
+)
+request_db_queries = Histogram(
+    "http_request_db_queries", "SQL statements per request", ("method", "route"), COUNT_BUCKETS
+)
+request_db_seconds = Histogram(
+    "http_request_db_seconds", "Total DB time per request", ("method", "route"), LATENCY_BUCKETS
+)
+request_redis_seconds = Histogram(
+    "http_request_redis_seconds", "Total redis time per request", ("method", "route"), LATENCY_BUCKETS
+)
+registry: list[Histogram | Gauge] = [
+    request_duration, request_db_queries, request_db_seconds, request_redis_seconds,
+]
+
+
+def register_gauge(name: str, help: str, labels: tuple[str, ...], fn: Callable[[], dict]) -> None:
+    registry.append(Gauge(name, help, labels, fn))
+
+
+def render() -> str:
+    return "\n".join(line for metric in registry for line in metric.render()) + "\n"
+
+
+class MetricsMiddleware:
+    # 순수 ASGI middleware (BaseHTTPMiddleware보다 오버헤드가 적고 streaming 응답에도 안전)
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metrics = RequestMetrics()
+        token = current_request.set(metrics)
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", metrics.server_timing(time.perf_counter() - start))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_request.reset(token)
+            # 경로 파라미터별로 series가 늘어나지 않도록 실제 path 대신 route 템플릿(/todos/{todo_id}) 사용
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            request_duration.observe((method, route, str(status)), time.perf_counter() - start)
+            request_db_queries.observe((method, route), metrics.db_queries)
+            request_db_seconds.observe((method, route), metrics.db_seconds)
+            request_redis_seconds.observe((method, route), metrics.redis_seconds)
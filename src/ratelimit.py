@@ -0,0 +1,117 @@
+import logging
+import math
+import time
+from collections import OrderedDict
+
+import redis.asyncio as redis
+from fastapi import HTTPException, Request
+
+from cache import get_redis
+from config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+# token bucket: capacity개까지 쌓이고 초당 rate개씩 채워짐, 요청마다 1개 사용
+# - 읽기 + 계산 + 저장을 하나의 script로 원자적으로 실행 (동시 요청, 여러 서버에서도 정확)
+# - 시간은 redis 서버 시간(TIME) 사용 -> 서버 간 시계 차이 영향 없음
+# - 반환: {허용 여부(1/0), 다시 시도까지 남은 초(문자열, lua number는 정수로 잘리므로)}
+TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(retry_after)}
+"""
+
+
+class LocalTokenBucket:
+    # redis 장애시 사용하는 프로세스 내 token bucket (서버별로 따로 계산되므로 근사치)
+    def __init__(self, maxsize: int = 10_000):
+        self.maxsize = maxsize
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict() # key -> (tokens, ts)
+
+    def hit(self, key: str, capacity: int, rate: float) -> float | None:
+        now = time.monotonic()
+        tokens, ts = self._buckets.pop(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - ts) * rate)
+        retry_after = None
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+
+local_buckets = LocalTokenBucket()
+
+
+async def hit(key: str, capacity: int, rate: float) -> float | None:
+    # 허용이면 None, 초과면 다시 시도까지 남은 초
+    try:
+        script = get_redis().register_script(TOKEN_BUCKET_SCRIPT)
+        allowed, retry_after = await script(keys=[f"ratelimit:{key}"], args=[capacity, rate])
+    except redis.RedisError:
+        logger.warning("rate limit check failed, using in-process bucket: %s", key, exc_info=True)
+        return local_buckets.hit(key, capacity, rate)
+    return None if int(allowed) else float(retry_after)
+
+
+class RateLimit:
+    # router.post(..., dependencies=[Depends(RateLimit("log-in", body_field="username"))])
+    # route의 dependencies는 handler(bcrypt 해싱 등)보다 먼저 실행됨
+    # - ip별: settings.rate_limit_ip_per_minute
+    # - body_field(username, email)별: settings.rate_limit_user_per_minute
+    def __init__(self, name: str, body_field: str | None = None):
+        self.name = name
+        self.body_field = body_field
+
+    async def __call__(self, request: Request) -> None:
+        settings = get_settings(request)
+        if not settings.rate_limit_enabled:
+            return
+
+        checks = [(f"{self.name}:ip:{request.client.host if request.client else 'unknown'}",
+                   settings.rate_limit_ip_per_minute)]
+        if self.body_field:
+            value = await self._body_value(request)
+            if value:
+                checks.append((f"{self.name}:{self.body_field}:{value}", settings.rate_limit_user_per_minute))
+
+        for key, per_minute in checks:
+            retry_after = await hit(key, capacity=per_minute, rate=per_minute / 60)
+            if retry_after is not None:
+                raise HTTPException(
+                    status_code=429,
+                    detail="Too Many Requests",
+                    headers={"Retry-After": str(math.ceil(retry_after))},
+                )
+
+    async def _body_value(self, request: Request) -> str | None:
+        # body는 starlette Request에 캐시되므로 handler의 body 파싱과 중복으로 읽지 않음
+        try:
+            body = await request.json()
+        except ValueError:
+            return None # 잘못된 body는 handler의 validation(422)에서 처리
+        value = body.get(self.body_field) if isinstance(body, dict) else None
+        return str(value).lower() if value is not None else None
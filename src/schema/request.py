@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import List
 
 
 class CreateToDoRequest(BaseModel):
@@ -7,6 +8,24 @@ class CreateToDoRequest(BaseModel):
     is_done: bool
     
 
+# bulk: 한번에 최대 1000개
+class BulkCreateToDoRequest(BaseModel):
+    todos: List[CreateToDoRequest] = Field(min_length=1, max_length=1000)
+
+
+class UpdateToDoItem(BaseModel):
+    id: int
+    is_done: bool
+
+
+class BulkUpdateToDoRequest(BaseModel):
+    todos: List[UpdateToDoItem] = Field(min_length=1, max_length=1000)
+
+
+class BulkDeleteToDoRequest(BaseModel):
+    ids: List[int] = Field(min_length=1, max_length=1000)
+    
+
 class SignUpRequest(BaseModel):
     username: str
     password: str
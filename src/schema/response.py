@@ -1,5 +1,7 @@
-from pydantic import BaseModel
-from typing import List
+from datetime import datetime
+
+from pydantic import BaseModel, TypeAdapter
+from typing import List, TypedDict
 
 
 class ToDoSchema(BaseModel): # orm에 생성한 컬럼과 동일일
@@ -14,6 +16,83 @@ class ToDoSchema(BaseModel): # orm에 생성한 컬럼과 동일일
 # 이것을 응답에 활용
 class ToDoListSchema(BaseModel):
     todos: List[ToDoSchema]
+    next_cursor: int | None = None # 다음 페이지 요청시 cursor로 전달, 마지막 페이지면 None
+
+
+# 목록 응답 fast path: ToDoListSchema와 같은 json을 검증 없이 한번에 직렬화 (pydantic-core)
+class ToDoRow(TypedDict):
+    id: int
+    contents: str
+    is_done: bool
+
+
+class ToDoListPayload(TypedDict):
+    todos: List[ToDoRow]
+    next_cursor: int | None
+
+
+todo_list_adapter = TypeAdapter(ToDoListPayload)
+todo_row_adapter = TypeAdapter(ToDoRow)
+
+
+# 검색(GET /todos/search): 관련도 순이므로 id cursor 대신 offset으로 페이지 이동
+class ToDoSearchSchema(BaseModel):
+    todos: List[ToDoSchema]
+    next_offset: int | None = None # 마지막 페이지면 None
+
+
+class ToDoSearchPayload(TypedDict):
+    todos: List[ToDoRow]
+    next_offset: int | None
+
+
+todo_search_adapter = TypeAdapter(ToDoSearchPayload)
+
+
+# 통계(GET /todos/stats)
+class ToDoStatsSchema(BaseModel):
+    total: int
+    done: int
+    pending: int
+
+
+# 변경분 조회(GET /todos/changes): 삭제된 todo도 deleted=True로 포함
+class ToDoChangeSchema(ToDoSchema):
+    seq: int
+    updated_at: datetime | None
+    deleted: bool
+
+
+class ToDoChangesSchema(BaseModel):
+    changes: List[ToDoChangeSchema]
+    next_since: int # 다음 요청의 since
+    has_more: bool # true면 next_since로 바로 이어서 요청
+
+
+class ToDoChangeRow(ToDoRow):
+    seq: int
+    updated_at: datetime | None
+    deleted: bool
+
+
+class ToDoChangesPayload(TypedDict):
+    changes: List[ToDoChangeRow]
+    next_since: int
+    has_more: bool
+
+
+todo_changes_adapter = TypeAdapter(ToDoChangesPayload)
+    
+    
+# bulk 요청의 항목별 결과 (status: 201/200/204 성공, 404 없는 todo)
+class BulkItemResultSchema(BaseModel):
+    id: int
+    status: int
+    todo: ToDoSchema | None = None
+
+
+class BulkResultSchema(BaseModel):
+    results: List[BulkItemResultSchema]
     
     
 class UserSchema(BaseModel):
@@ -1,5 +1,17 @@
+import time
+from collections import OrderedDict
+
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from fastapi import Depends, HTTPException
+from jose import JWTError
+
+from config import Settings, get_settings, settings
+from database.connection import open_session
+from database.orm import User
+from database.repository import AsyncUserRepository
+from metrics import track
+from schema.response import UserSchema
+from service.user import UserService
 
 
 # api에서 dependency로 사용할 수 있는 함수 정의
@@ -12,4 +24,89 @@ def get_access_token(
             status_code=401,
             detail="Not Authorized"
             )
-    return auth_header.credentials
\ No newline at end of file
+    return auth_header.credentials
+
+
+class TokenCache:
+    # 검증된 access_token -> 유저 정보 (LRU, 최대 maxsize개)
+    # 토큰의 exp(또는 ttl)가 지나면 조회 시점에 제거
+    def __init__(self, maxsize: int, ttl: int):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[UserSchema, float]] = OrderedDict()
+
+    def get(self, access_token: str) -> UserSchema | None:
+        entry = self._entries.get(access_token)
+        if entry is None:
+            return None
+        user, expires_at = entry
+        if expires_at <= time.time():
+            del self._entries[access_token]
+            return None
+        self._entries.move_to_end(access_token)
+        return user
+
+    def set(self, access_token: str, user: UserSchema, exp: float) -> None:
+        self._entries[access_token] = (user, min(exp, time.time() + self.ttl))
+        self._entries.move_to_end(access_token)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+# app lifespan에서 settings로 생성 (main.py)
+token_cache: TokenCache | None = None
+
+
+def init_token_cache(settings: Settings) -> TokenCache:
+    global token_cache
+    token_cache = TokenCache(maxsize=settings.auth_cache_size, ttl=settings.auth_cache_ttl)
+    return token_cache
+
+
+def get_token_cache(settings: Settings = settings) -> TokenCache:
+    # lifespan 밖(스크립트, 테스트)에서 호출되어도 동작하도록 lazy init
+    return token_cache or init_token_cache(settings)
+
+
+async def get_current_user(
+    access_token: str = Depends(get_access_token),
+    user_service: UserService = Depends(),
+    user_repo: AsyncUserRepository = Depends(),
+    settings: Settings = Depends(get_settings),
+) -> UserSchema:
+    cache: TokenCache = get_token_cache(settings)
+    # 캐시 hit: jwt 검증과 DB 조회 모두 생략
+    user: UserSchema | None = cache.get(access_token)
+    if user:
+        return user
+
+    try:
+        with track("jwt"):
+            claims: dict = user_service.decode_jwt_claims(access_token=access_token)
+    except JWTError:
+        raise HTTPException(status_code=401, detail="Not Authorized")
+
+    db_user: User | None = await user_repo.get_user_by_username(username=claims["sub"])
+    if not db_user:
+        raise HTTPException(status_code=404, detail="User Not Found")
+
+    user = UserSchema.model_validate(db_user)
+    cache.set(access_token, user, exp=claims["exp"])
+    return user
+
+
+async def get_stream_user(
+    access_token: str = Depends(get_access_token),
+    user_service: UserService = Depends(),
+    settings: Settings = Depends(get_settings),
+) -> UserSchema:
+    # 스트리밍 응답용 get_current_user: 요청 단위 session(get_session)은 응답이 끝날 때까지 닫히지 않으므로
+    # 유저 조회에만 session을 열고 바로 닫음 -> 연결이 유지되는 동안 DB 커넥션을 잡고 있지 않음
+    async with open_session(settings) as session:
+        return await get_current_user(
+            access_token=access_token, user_service=user_service, user_repo=AsyncUserRepository(session=session),
+            settings=settings,
+        )
@@ -0,0 +1,101 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+from fastapi import HTTPException
+
+from config import Settings, settings
+
+
+# 별도 프로세스에서 실행되므로 pickle 가능한 모듈 레벨 함수로 정의
+def _hashpw(plain_password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(plain_password, salt=bcrypt.gensalt(rounds=rounds))
+
+
+def _checkpw(plain_password: bytes, hashed_password: bytes) -> bool:
+    return bcrypt.checkpw(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    # bcrypt 전용 프로세스 풀
+    # - request threadpool / event loop를 점유하지 않음
+    # - 실행중 + 대기중 작업이 max_workers + max_queue를 넘으면 503으로 바로 거절 (backpressure)
+    encoding: str = "UTF-8"
+
+    def __init__(self, max_workers: int, max_queue: int, rounds: int):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.rounds = rounds
+        self.in_flight: int = 0
+        self._executor: ProcessPoolExecutor | None = None
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None: # 첫 요청 시점에 생성
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def _submit(self, fn, *args):
+        if self.in_flight >= self.max_workers + self.max_queue:
+            raise HTTPException(
+                status_code=503,
+                detail="Service Unavailable",
+                headers={"Retry-After": "1"},
+            )
+        self.in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+        finally:
+            self.in_flight -= 1
+
+    async def hash(self, plain_password: str) -> str:
+        hashed: bytes = await self._submit(
+            _hashpw, plain_password.encode(self.encoding), self.rounds
+        )
+        return hashed.decode(self.encoding)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit(
+            _checkpw,
+            plain_password.encode(self.encoding),
+            hashed_password.encode(self.encoding),
+        )
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        # $2b$12$... 형식에서 cost(rounds)가 현재 설정과 다르면 재해싱 대상
+        return int(hashed_password.split("$")[2]) != self.rounds
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+# app lifespan에서 settings로 생성/종료 (main.py)
+password_hasher: PasswordHasher | None = None
+
+
+def init_password_hasher(settings: Settings) -> PasswordHasher:
+    global password_hasher
+    password_hasher = PasswordHasher(
+        max_workers=settings.password_hash_workers,
+        max_queue=settings.password_hash_queue,
+        rounds=settings.bcrypt_rounds,
+    )
+    return password_hasher
+
+
+def close_password_hasher() -> None:
+    global password_hasher
+    if password_hasher is not None:
+        password_hasher.shutdown() # bcrypt 프로세스 풀 종료
+        password_hasher = None
+
+
+def get_password_hasher() -> PasswordHasher:
+    # lifespan 밖(스크립트, 테스트)에서 호출되어도 동작하도록 lazy init
+    return password_hasher or init_password_hasher(settings)
@@ -1,28 +1,29 @@
+import asyncio
 import random
-import time
-import bcrypt
 from jose import jwt
 from datetime import datetime, timedelta
 
+from service.password import get_password_hasher
+
 class UserService:
     encoding: str = "UTF-8"
     secret_key: str = "secret"
     jwt_algorithm: str = "HS256"
     
-    def hash_password(self, plain_password: str) -> str:
-        hash_password: bytes = bcrypt.hashpw(
-            plain_password.encode(self.encoding), 
-            salt=bcrypt.gensalt(),
-            )
-        return hash_password.decode(self.encoding)
+    # bcrypt는 전용 프로세스 풀에서 실행 (service/password.py)
+    async def hash_password(self, plain_password: str) -> str:
+        return await get_password_hasher().hash(plain_password=plain_password)
     
-    def verify_password(
+    async def verify_password(
         self, plain_password: str, hashed_password: str) -> bool:
-        return bcrypt.checkpw(
-            plain_password.encode(self.encoding),
-            hashed_password.encode(self.encoding),
+        return await get_password_hasher().verify(
+            plain_password=plain_password,
+            hashed_password=hashed_password,
             )
 
+    def password_needs_rehash(self, hashed_password: str) -> bool:
+        return get_password_hasher().needs_rehash(hashed_password=hashed_password)
+
     def create_jwt(self, username: str) -> str:
         return jwt.encode(
             {
@@ -34,19 +35,26 @@ class UserService:
             )
         
     def decode_jwt(self, access_token: str) -> str:
-        payload: dict = jwt.decode(
+        payload: dict = self.decode_jwt_claims(access_token=access_token)
+        
+        return payload["sub"] # username
+
+    def decode_jwt_claims(self, access_token: str) -> dict:
+        # 서명, 만료(exp) 검증 후 전체 payload 반환
+        return jwt.decode(
             access_token,
             self.secret_key,
             algorithms=[self.jwt_algorithm]
             )
-        
-        return payload["sub"] # username
     
     @staticmethod
     def create_otp() -> int:
         return random.randint(1000, 9999) # 4자리 랜덤 숫자
     
     @staticmethod
-    def send_email_to_user(email: str) -> None:
-        time.sleep(10) # 실제 이메일 전송은 아니고 10초 대기
-        print(f"Sending email to {email}!")
\ No newline at end of file
+    async def send_emails(emails: list[str], delay: float) -> None:
+        # jobs.email_queue의 worker에서 batch 단위로 호출
+        # 실제 이메일 전송은 아니고 대기 (한번의 연결로 여러 통 전송하는 효과)
+        await asyncio.sleep(delay)
+        for email in emails:
+            print(f"Sending email to {email}!")
\ No newline at end of file
@@ -0,0 +1,107 @@
+import logging
+from typing import List, TypedDict
+
+import redis.asyncio as redis
+
+from cache import get_redis, todo_cache
+from database.repository import AsyncToDoRepository
+from todo_events import ToDoEvent, on_todo_change
+
+logger = logging.getLogger(__name__)
+
+
+class ToDoCounts(TypedDict):
+    total: int
+    done: int
+
+
+# 유저별 todo 통계: todos:{user_id}:stats hash {total, done, seq}
+# - 쓰기마다 변경 이벤트로 증감 (HINCRBY), 조회는 HMGET 한번
+# - 없으면(최초, 만료) 또는 refresh 요청시 SQL 집계로 다시 채움 (reconcile)
+# - seq: 집계 시점의 user.todo_seq, 그 이하의 변경은 집계에 이미 포함되어 있으므로 증감하지 않음
+#   (commit 이후 dispatch되는 이벤트는 늦게 도착할 수 있음)
+
+# KEYS[1]: stats hash, ARGV: (seq, total 증감, done 증감) 반복
+# hash가 없으면 아무것도 하지 않음 (다음 조회에서 집계)
+APPLY_SCRIPT = """
+local base = tonumber(redis.call('HGET', KEYS[1], 'seq'))
+if not base then
+    return 0
+end
+for i = 1, #ARGV, 3 do
+    if tonumber(ARGV[i]) > base then
+        redis.call('HINCRBY', KEYS[1], 'total', ARGV[i + 1])
+        redis.call('HINCRBY', KEYS[1], 'done', ARGV[i + 2])
+    end
+end
+return 1
+"""
+
+
+def _delta(event: ToDoEvent) -> tuple[int, int]:
+    # (total 증감, done 증감)
+    if event["type"] == "created":
+        return 1, int(event["todo"]["is_done"])
+    if event["type"] == "updated":
+        return 0, int(event["todo"]["is_done"]) - int(bool(event["was_done"]))
+    if event["type"] == "deleted":
+        return -1, -int(bool(event["was_done"]))
+    return 0, 0
+
+
+class ToDoStats:
+    ttl: int = 24 * 60 * 60 # 증감이 어긋나도(redis 장애 등) 하루 안에는 다시 집계
+
+    @staticmethod
+    def key(user_id: int) -> str:
+        return f"{todo_cache.user_namespace(user_id)}:stats"
+
+    async def get(self, user_id: int) -> ToDoCounts | None:
+        # 저장된 통계, 없거나 redis 장애면 None
+        try:
+            total, done = await get_redis().hmget(self.key(user_id), ["total", "done"])
+        except redis.RedisError:
+            logger.warning("todo stats read failed: %s", user_id, exc_info=True)
+            return None
+        if total is None or done is None:
+            return None
+        return {"total": int(total), "done": int(done)}
+
+    async def set(self, user_id: int, seq: int, counts: ToDoCounts) -> None:
+        try:
+            async with get_redis().pipeline(transaction=True) as pipe:
+                pipe.hset(self.key(user_id), mapping={**counts, "seq": seq})
+                pipe.expire(self.key(user_id), self.ttl)
+                await pipe.execute()
+        except redis.RedisError:
+            logger.warning("todo stats write failed: %s", user_id, exc_info=True)
+
+    async def reconcile(self, user_id: int, todo_repo: AsyncToDoRepository) -> ToDoCounts:
+        # SQL 집계로 다시 채움, 저장할 때까지 유저 row lock을 유지해서 그 사이의 쓰기가 누락되지 않도록
+        # (lock 이후의 쓰기는 seq가 더 크고, 이벤트는 저장 이후에 도착)
+        async with todo_repo.lock_todo_counts(user_id=user_id) as (seq, total, done):
+            counts: ToDoCounts = {"total": total, "done": done}
+            await self.set(user_id, seq, counts)
+        return counts
+
+    async def apply(self, events: List[ToDoEvent]) -> None:
+        args_by_user: dict[int, list[int]] = {}
+        for event in events:
+            if event["user_id"] is None or event["seq"] is None:
+                continue
+            total, done = _delta(event)
+            if total or done:
+                args_by_user.setdefault(event["user_id"], []).extend((event["seq"], total, done))
+        if not args_by_user:
+            return
+        script = get_redis().register_script(APPLY_SCRIPT)
+        for user_id, args in args_by_user.items():
+            await script(keys=[self.key(user_id)], args=args)
+
+
+todo_stats = ToDoStats()
+
+
+@on_todo_change
+async def count_events(events: List[ToDoEvent]) -> None:
+    await todo_stats.apply(events)
@@ -1,8 +1,85 @@
+import os
+import tempfile
+
+# main을 import 하기 전에 MySQL 대신 sqlite 파일 DB를 사용하도록 설정 (sync: pysqlite, async: aiosqlite)
+_db_path = os.path.join(tempfile.mkdtemp(), "test.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_db_path}")
+os.environ.setdefault("ASYNC_DATABASE_URL", f"sqlite+aiosqlite:///{_db_path}")
+# repository를 mocking하는 테스트가 캐시된 응답을 받지 않도록 기본은 캐시 off (test_cache.py에서 켜서 검증)
+os.environ.setdefault("TODO_CACHE_ENABLED", "false")
+# 변경 스트림은 redis pub/sub 대신 프로세스 내 broker 사용
+os.environ.setdefault("TODO_EVENTS_BROKER", "memory")
+
+import fakeredis
 import pytest
 from fastapi.testclient import TestClient
 from main import app
 
+import cache
+import main
+from config import settings
+from database.connection import get_database
+from database.orm import Base, User
+from security import get_token_cache
+from service.user import UserService
+from tests.query_budget import assert_max_queries
+
 # fixture는 함수형태로 만들어야함
 @pytest.fixture
 def client():
     return TestClient(app=app)
+
+
+@pytest.fixture
+def app_client(redis, monkeypatch):
+    # 전역 settings를 바꾸지 않고 create_app(settings)로 설정을 바꾼 app 생성
+    # ex. app_client(db_async=False), with app_client(bcrypt_rounds=4) as client: -> lifespan까지 실행
+    monkeypatch.setattr(main, "init_redis", lambda settings: redis)
+
+    def _app_client(**overrides) -> TestClient:
+        return TestClient(app=main.create_app(settings.model_copy(update=overrides)))
+    return _app_client
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def db():
+    # 테스트마다 빈 테이블을 생성하고 끝나면 삭제
+    engine = get_database().engine
+    Base.metadata.create_all(bind=engine)
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def headers(db):
+    # sqlite에 실제 유저를 저장하고 해당 유저의 인증 헤더 반환
+    with get_database().session_factory() as session:
+        session.add(User.create(username="test", hashed_password="hashed"))
+        session.commit()
+    access_token: str = UserService().create_jwt(username="test")
+    return {"Authorization": f"Bearer {access_token}"}
+
+
+@pytest.fixture
+def query_budget():
+    # with query_budget(2, "GET /todos"): ... -> 쿼리가 2개를 넘으면 실패
+    return assert_max_queries
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    # 테스트 간에 같은 토큰이 생성될 수 있으므로 인증 캐시 초기화
+    get_token_cache().clear()
+
+
+@pytest.fixture(autouse=True)
+def redis(monkeypatch):
+    # 실제 redis 대신 in-process fakeredis 사용 (lua script 포함)
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(cache, "redis_client", client)
+    return client
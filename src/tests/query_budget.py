@@ -0,0 +1,39 @@
+from contextlib import contextmanager
+from typing import Iterator
+
+import pytest
+from sqlalchemy import event
+
+from database.connection import get_database
+
+
+class QueryCounter:
+    # sync/async 엔진(replica가 설정되어 있으면 replica 엔진 포함)에서 실행된 SQL statement 기록
+    def __init__(self):
+        self.statements: list[str] = []
+        self._engines = tuple(get_database().pools().values())
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(" ".join(statement.split()))
+
+    def __enter__(self) -> "QueryCounter":
+        for e in self._engines:
+            event.listen(e, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        for e in self._engines:
+            event.remove(e, "before_cursor_execute", self._record)
+
+
+@contextmanager
+def assert_max_queries(budget: int, name: str = "block") -> Iterator[QueryCounter]:
+    # with 블록 안에서 budget보다 많은 쿼리가 실행되면 실패, 실행된 쿼리 목록을 메시지에 출력
+    with QueryCounter() as counter:
+        yield counter
+    if len(counter.statements) > budget:
+        statements = "\n".join(f"  {i}. {s}" for i, s in enumerate(counter.statements, 1))
+        pytest.fail(
+            f"{name} issued {len(counter.statements)} queries (budget {budget}):\n{statements}",
+            pytrace=False,
+        )
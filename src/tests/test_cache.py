@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from cache import save_otp, todo_cache, verify_otp
+
+
+@pytest.mark.anyio
+async def test_otp_max_attempts(redis):
+    await save_otp(redis, email="a@b.com", otp=1234, ttl=180)
+    assert 0 < await redis.ttl("otp:a@b.com") <= 180
+
+    for _ in range(3):
+        assert await verify_otp(redis, email="a@b.com", otp=1111, max_attempts=3) is False
+
+    # 시도횟수 초과로 otp가 폐기되어 맞는 값도 실패
+    assert await redis.get("otp:a@b.com") is None
+    assert await verify_otp(redis, email="a@b.com", otp=1234, max_attempts=3) is False
+
+    # 새 otp 발급시 시도횟수 초기화
+    await save_otp(redis, email="a@b.com", otp=5678, ttl=180)
+    assert await verify_otp(redis, email="a@b.com", otp=1111, max_attempts=3) is False
+    assert await verify_otp(redis, email="a@b.com", otp=5678, max_attempts=3) is True
+
+
+def test_todo_cache(app_client, headers, monkeypatch):
+    client = app_client(todo_cache_enabled=True)
+    monkeypatch.setattr(todo_cache, "hits", 0)
+    monkeypatch.setattr(todo_cache, "misses", 0)
+
+    response = client.post("/todos/bulk", json={"todos": [{"contents": "todo", "is_done": False}]}, headers=headers)
+    assert response.status_code == 201
+
+    # 첫 조회 miss, 두번째 hit
+    for _ in range(2):
+        assert client.get("/todos", headers=headers).json()["todos"] == [
+            {"id": 1, "contents": "todo", "is_done": False}
+        ]
+        assert client.get("/todos/1").json() == {"id": 1, "contents": "todo", "is_done": False}
+    assert client.get("/health/cache").json() == {"enabled": True, "hits": 2, "misses": 2, "errors": 0}
+
+    # 수정하면 캐시 버전이 올라가서 새 데이터 조회
+    client.patch("/todos/1", json={"is_done": True})
+    assert client.get("/todos", headers=headers).json()["todos"][0]["is_done"] is True
+    assert client.get("/todos/1").json()["is_done"] is True
+
+    client.delete("/todos/1")
+    assert client.get("/todos", headers=headers).json()["todos"] == []
+    assert client.get("/todos/1").status_code == 404
+
+
+@pytest.mark.anyio
+async def test_todo_version_never_repeats(redis):
+    namespace = todo_cache.user_namespace(1)
+    assert await todo_cache.version(namespace) == (None, 0) # 쓰기 전에는 버전 없음
+    await todo_cache.invalidate({namespace: 1})
+    first, _ = await todo_cache.version(namespace)
+    await todo_cache.invalidate({namespace: 3})
+    assert await todo_cache.version(namespace) == (first + 1, 3)
+    await todo_cache.invalidate({namespace: 2}) # 늦게 도착한 이전 변경: seq는 줄지 않음
+    assert await todo_cache.version(namespace) == (first + 2, 3)
+
+    # 버전 키가 만료되어도 0부터 다시 시작하지 않음 (이전 ETag와 겹치지 않도록)
+    await redis.delete(f"{namespace}:version")
+    await asyncio.sleep(0.01)
+    await todo_cache.invalidate({namespace: 4})
+    version, seq = await todo_cache.version(namespace)
+    assert version > first + 2 and seq == 4
+    assert 0 < await redis.ttl(f"{namespace}:version") <= todo_cache.version_ttl
+
+
+@pytest.mark.parametrize("cache_enabled", [True, False])
+def test_todo_reads_do_not_create_versions(app_client, headers, redis, cache_enabled):
+    client = app_client(todo_cache_enabled=cache_enabled)
+    # 없는 todo 조회(인증 없음)는 redis에 키를 만들지 않음
+    for todo_id in range(1, 51):
+        assert client.get(f"/todos/{todo_id}").status_code == 404
+    assert asyncio.run(redis.keys("*")) == []
+
+    # 버전 키가 없으면(만료) DB에서 todo를 확인한 뒤에 생성 -> ETag
+    client.post("/todos", json={"contents": "todo", "is_done": False})
+    asyncio.run(redis.flushall())
+    response = client.get("/todos/1")
+    assert response.status_code == 200
+    assert asyncio.run(redis.exists(f"{todo_cache.todo_namespace(1)}:version")) == 1
+    assert client.get("/todos/1", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
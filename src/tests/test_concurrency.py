@@ -0,0 +1,73 @@
+import asyncio
+
+import httpx
+import pytest
+
+from concurrency import ConcurrencyLimiter, limiters
+from database.orm import ToDo
+from database.repository import AsyncToDoRepository
+
+
+@pytest.mark.anyio
+async def test_concurrency_limiter():
+    limiter = ConcurrencyLimiter()
+    assert await limiter.acquire(limit=1, max_waiting=1, wait_timeout=1)
+
+    waiting = asyncio.create_task(limiter.acquire(limit=1, max_waiting=1, wait_timeout=1))
+    await asyncio.sleep(0)
+    assert limiter.waiting == 1
+    # queue가 가득 차면 바로 거절
+    assert await limiter.acquire(limit=1, max_waiting=1, wait_timeout=1) is False
+
+    limiter.release() # 대기자에게 슬롯을 넘김
+    assert await waiting is True
+    assert (limiter.active, limiter.waiting) == (1, 0)
+
+    # 대기 시간 초과
+    assert await limiter.acquire(limit=1, max_waiting=1, wait_timeout=0.01) is False
+    assert limiter.rejected == 2
+
+    # 대기 중 취소되면 queue에서 빠짐
+    cancelled = asyncio.create_task(limiter.acquire(limit=1, max_waiting=1, wait_timeout=1))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await cancelled
+    assert limiter.waiting == 0
+
+    limiter.release()
+    assert limiter.active == 0
+
+
+@pytest.mark.anyio
+async def test_route_load_shedding(app_client, monkeypatch):
+    app = app_client(todo_concurrency=1, concurrency_queue_size=1, concurrency_wait_timeout=0.05).app
+    limiters.pop("GET /todos/{todo_id}", None)
+
+    release = asyncio.Event()
+
+    async def slow_get_todo(self, todo_id: int, min_seq: int | None = None):
+        await release.wait() # DB 지연
+        return ToDo(id=todo_id, contents="todo", is_done=False)
+
+    monkeypatch.setattr(AsyncToDoRepository, "get_todo_by_todo_id", slow_get_todo)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        first = asyncio.create_task(client.get("/todos/1"))
+        await asyncio.sleep(0.01)
+
+        # 실행 중 1 + 대기 1 -> 대기 시간 초과로 503
+        response = await client.get("/todos/2")
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
+        metrics = (await client.get("/metrics")).text
+        assert 'route_concurrency{route="GET /todos/{todo_id}",state="active"} 1' in metrics
+        assert 'route_concurrency{route="GET /todos/{todo_id}",state="rejected"} 1' in metrics
+        assert 'threadpool_tokens{state="total"}' in metrics
+
+        release.set()
+        assert (await first).status_code == 200
+
+    assert limiters["GET /todos/{todo_id}"].active == 0
@@ -0,0 +1,39 @@
+import pytest
+from sqlalchemy import exc, text
+
+from config import settings
+from database.connection import create_db_engine, pool_status
+from metrics import RequestMetrics, current_request
+
+
+def test_pool_timeout_is_recorded():
+    engine = create_db_engine(
+        settings.model_copy(update={"db_pool_size": 1, "db_max_overflow": 0, "db_pool_timeout": 0.01})
+    )
+    with engine.connect():
+        assert pool_status(engine)["checked_out"] == 1
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+
+    status = pool_status(engine)
+    assert status["checked_out"] == 0
+    assert status["timeouts"] == 1
+    assert status["wait_seconds_max"] >= 0.01
+    engine.dispose()
+
+
+def test_failed_query_timing():
+    # 실패한 쿼리는 after_cursor_execute가 호출되지 않음 -> 커넥션에 시작 시간이 남지 않아야 함
+    engine = create_db_engine(settings, url="sqlite://")
+    metrics = RequestMetrics()
+    token = current_request.set(metrics)
+    try:
+        with engine.connect() as conn:
+            with pytest.raises(exc.OperationalError):
+                conn.execute(text("SELECT * FROM missing"))
+            conn.execute(text("SELECT 1"))
+            assert "query_start" not in conn.connection.info
+    finally:
+        current_request.reset(token)
+    assert metrics.db_queries == 1
+    engine.dispose()
@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+
+from jobs import JobQueue
+
+
+@pytest.mark.anyio
+async def test_job_queue_batches_and_drains():
+    batches: list[list[int]] = []
+
+    async def handler(batch: list[int]) -> None:
+        await asyncio.sleep(0.01)
+        batches.append(batch)
+
+    queue = JobQueue(
+        handler=handler, concurrency=1, batch_size=3, max_retries=0, retry_backoff=0, maxsize=10
+    )
+    queue.start()
+    for i in range(7):
+        queue.enqueue(i)
+
+    await queue.stop(timeout=1) # 남은 작업을 모두 처리한 뒤 종료
+    assert sorted(i for batch in batches for i in batch) == list(range(7))
+    assert all(len(batch) <= 3 for batch in batches)
+    assert len(batches) < 7
+
+
+@pytest.mark.anyio
+async def test_job_queue_retry():
+    calls: list[list[str]] = []
+
+    async def handler(batch: list[str]) -> None:
+        calls.append(batch)
+        if len(calls) < 3:
+            raise ConnectionError
+
+    queue = JobQueue(
+        handler=handler, concurrency=1, batch_size=10, max_retries=3, retry_backoff=0.001, maxsize=10
+    )
+    queue.start()
+    queue.enqueue("a@b.com")
+    await queue.stop(timeout=1)
+
+    assert calls == [["a@b.com"]] * 3
@@ -1,7 +1,86 @@
+from fastapi.testclient import TestClient
+
+import cache
+import jobs
+import main
+import security
+import todo_events
+from config import settings
+from database import connection
+from database.connection import pool_status
+from service import password
+
 
 def test_health_check(client):
     response = client.get("/") # 이방식으로 앱에 get요청, 결과를 response에 저장
     
     assert response.status_code == 200
     assert response.json() == {"ping": "pong"}
-      
\ No newline at end of file
+      
+
+def test_db_pool(client, db):
+    client.get("/todos/1")
+    response = client.get("/health/db-pool")
+
+    assert response.status_code == 200
+    pool = response.json()["async"]
+    assert pool["checkouts"] >= 1
+    assert pool["checked_out"] == 0
+    assert set(pool) >= {"size", "overflow", "timeouts", "wait_seconds_total", "wait_seconds_max"}
+
+
+def test_metrics(client, headers):
+    client.post("/todos/bulk", json={"todos": [{"contents": "todo", "is_done": False}]}, headers=headers)
+    security.get_token_cache().clear()
+    response = client.get("/todos", headers=headers)
+
+    server_timing = response.headers["Server-Timing"]
+    assert "db;dur=" in server_timing
+    assert "jwt;dur=" in server_timing
+    assert "serialize;dur=" in server_timing
+    assert 'db_queries;desc="' in server_timing
+
+    body = client.get("/metrics").text
+    assert 'http_request_duration_seconds_count{method="GET",route="/todos",status="200"}' in body
+    assert 'http_request_db_queries_bucket{method="GET",route="/todos",le="+Inf"}' in body
+    assert 'http_request_redis_seconds_count{method="POST",route="/todos/bulk"}' in body
+    assert 'db_pool_connections{engine="async",state="checked_out"} 0' in body
+
+
+def test_create_app_lifespan(tmp_path, monkeypatch):
+    # settings를 바꿔서 app 생성 -> lifespan에서 엔진/redis 생성, 커넥션 warm-up, 종료시 dispose
+    db_path = tmp_path / "app.db"
+    app_settings = settings.model_copy(update={
+        "database_url": f"sqlite:///{db_path}",
+        "async_database_url": f"sqlite+aiosqlite:///{db_path}",
+        "db_pool_warmup": 2,
+        "db_pool_slow_wait": 0.5,
+        "auth_cache_size": 7,
+        "bcrypt_rounds": 4,
+        "todo_events_queue_size": 3,
+        "email_queue_size": 5,
+    })
+    for module, name in ((connection, "database"), (security, "token_cache"), (password, "password_hasher"),
+                         (todo_events, "broker"), (jobs, "email_queue")):
+        monkeypatch.setattr(module, name, None)
+    monkeypatch.setattr(main, "init_redis", lambda settings: cache.redis_client)
+
+    app = main.create_app(app_settings)
+    assert connection.database is None # app 생성만으로는 엔진을 만들지 않음
+
+    with TestClient(app) as client:
+        database = connection.database
+        assert database.settings is app_settings
+        assert database.engine.url.database == str(db_path)
+        assert pool_status(database.async_engine.sync_engine)["checked_in"] == 2
+        assert database.async_engine.pool.stats.slow_wait == 0.5
+        # 전역 settings가 아니라 app settings로 생성
+        assert security.token_cache.maxsize == 7
+        assert password.password_hasher.rounds == 4
+        assert todo_events.broker.queue_size == 3
+        assert jobs.email_queue.maxsize == 5
+        assert client.get("/").json() == {"ping": "pong"}
+
+    assert connection.database is None
+    assert (password.password_hasher, todo_events.broker, jobs.email_queue) == (None, None, None)
+    assert pool_status(database.async_engine.sync_engine)["checked_in"] == 0
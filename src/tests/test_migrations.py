@@ -0,0 +1,56 @@
+import logging
+
+from sqlalchemy import create_engine, text
+
+from database.migrations import check_schema, migrate, missing_columns, missing_indexes, missing_search_index
+from database.orm import Base
+
+
+def test_migrate_existing_tables(tmp_path, caplog):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(bind=engine)
+    # 인덱스 추가 이전에 만들어진 테이블
+    with engine.begin() as conn:
+        for name in ("ix_user_username", "ix_todo_user_id_id", "ix_todo_user_id_is_done", "ix_todo_id", "ix_user_id"):
+            conn.execute(text(f"DROP INDEX {name}"))
+
+    assert {index.name for index in missing_indexes(engine)} == {
+        "ix_user_username", "ix_todo_user_id_id", "ix_todo_user_id_is_done",
+    }
+    with caplog.at_level(logging.WARNING):
+        assert len(check_schema(engine)) == 3
+    assert "missing index ix_user_username on user (username)" in caplog.text
+
+    assert len(migrate(engine)) == 3
+    assert missing_indexes(engine) == []
+    assert migrate(engine) == [] # 다시 실행해도 안전
+    engine.dispose()
+
+
+
+def test_migrate_adds_columns(tmp_path):
+    # 변경 추적 컬럼 추가 이전의 테이블 (README의 CREATE TABLE)
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE user (id INTEGER PRIMARY KEY, username VARCHAR(256) NOT NULL, password VARCHAR(256) NOT NULL)"))
+        conn.execute(text("CREATE TABLE todo (id INTEGER PRIMARY KEY, contents VARCHAR(256) NOT NULL, is_done BOOLEAN NOT NULL, user_id INTEGER)"))
+        conn.execute(text("INSERT INTO user VALUES (1, 'a', 'p'), (2, 'b', 'p')"))
+        conn.execute(text("INSERT INTO todo VALUES (1, 'x', 0, 1), (2, 'y', 1, 2), (3, 'z', 0, 1)"))
+
+    assert {f"{column.table.name}.{column.name}" for column in missing_columns(engine)} == {
+        "user.todo_seq", "todo.seq", "todo.updated_at", "todo.deleted_at",
+    }
+    assert missing_search_index(engine)
+    migrate(engine)
+    assert missing_columns(engine) == [] and missing_indexes(engine) == []
+    assert not missing_search_index(engine)
+    with engine.connect() as conn:
+        # 기존 todo는 id가 변경 번호, 유저의 todo_seq는 그 최대값
+        assert conn.execute(text("SELECT id, seq FROM todo WHERE updated_at IS NOT NULL ORDER BY id")).all() == [
+            (1, 1), (2, 2), (3, 3),
+        ]
+        assert conn.execute(text("SELECT id, todo_seq FROM user ORDER BY id")).all() == [(1, 3), (2, 2)]
+        # 기존 row도 검색 인덱스에 포함
+        assert conn.execute(text("SELECT rowid FROM todo_fts WHERE todo_fts MATCH 'y'")).all() == [(2,)]
+    assert migrate(engine) == []
+    engine.dispose()
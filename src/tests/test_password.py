@@ -0,0 +1,31 @@
+import pytest
+from fastapi import HTTPException
+
+from service.password import PasswordHasher
+
+
+@pytest.mark.anyio
+async def test_password_hasher():
+    hasher = PasswordHasher(max_workers=1, max_queue=0, rounds=4)
+    try:
+        hashed: str = await hasher.hash(plain_password="plain")
+        assert hashed.startswith("$2b$04$")
+        assert await hasher.verify(plain_password="plain", hashed_password=hashed) is True
+        assert await hasher.verify(plain_password="wrong", hashed_password=hashed) is False
+
+        assert hasher.needs_rehash(hashed_password=hashed) is False
+        hasher.rounds = 5
+        assert hasher.needs_rehash(hashed_password=hashed) is True
+    finally:
+        hasher.shutdown()
+
+
+@pytest.mark.anyio
+async def test_password_hasher_backpressure():
+    hasher = PasswordHasher(max_workers=1, max_queue=1, rounds=4)
+    hasher.in_flight = 2 # 실행중 1 + 대기중 1 -> 꽉 참
+
+    with pytest.raises(HTTPException) as e:
+        await hasher.hash(plain_password="plain")
+    assert e.value.status_code == 503
+    assert e.value.headers == {"Retry-After": "1"}
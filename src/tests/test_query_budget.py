@@ -0,0 +1,73 @@
+import pytest
+
+from config import settings
+from security import get_token_cache
+
+# route별 최대 쿼리 수 (인증이 필요한 route는 토큰 캐시 miss시 유저 조회 1회 포함)
+# eager join, N+1 등으로 쿼리가 늘어나면 실패
+BUDGETS = [
+    # api/todo.py (유저의 todo 쓰기는 변경 번호 예약 UPDATE user 1회 포함)
+    ("GET", "/todos", None, 2),
+    ("GET", "/todos/export", None, 2),
+    ("GET", "/todos/changes", None, 2),
+    ("GET", "/todos/search?q=todo", None, 2),
+    ("GET", "/todos/stats", None, 3), # 통계가 없을 때: 유저 row lock + GROUP BY 집계
+    ("POST", "/todos/bulk", {"todos": [{"contents": "a", "is_done": False}] * 3}, 3), # row 수와 무관
+    ("PATCH", "/todos/bulk", {"todos": [{"id": 1, "is_done": True}, {"id": 2, "is_done": False}]}, 4),
+    ("DELETE", "/todos/bulk", {"ids": [1, 2]}, 3),
+    ("GET", "/todos/1", None, 1),
+    ("POST", "/todos", {"contents": "a", "is_done": False}, 2),
+    ("PATCH", "/todos/1", {"is_done": True}, 2),
+    ("DELETE", "/todos/1", None, 2),
+    # api/user.py
+    ("POST", "/users/sign-up", {"username": "new", "password": "plain"}, 2),
+    ("POST", "/users/log-in", {"username": "budget", "password": "plain"}, 1),
+    ("POST", "/users/email/otp", {"email": "a@b.com"}, 0),
+    ("POST", "/users/email/otp/verify", {"email": "a@b.com", "otp": 1234}, 1),
+]
+
+
+@pytest.fixture(params=[False, True], ids=["primary", "replica"])
+def client(request, app_client, db):
+    # replica: 같은 sqlite 파일을 replica url로 설정 (복제 지연 없음) -> replica로 보낸 읽기도 budget에 포함되는지
+    overrides = {"bcrypt_rounds": 4, "email_send_delay": 0}
+    if request.param:
+        overrides.update(
+            replica_database_url=settings.database_url, async_replica_database_url=settings.async_database_url
+        )
+    with app_client(**overrides) as client: # lifespan에서 app settings로 엔진, password hasher 등 생성
+        yield client
+
+
+@pytest.fixture
+def seeded(client, headers, mocker):
+    mocker.patch("service.user.UserService.create_otp", return_value=1234)
+
+    client.post("/users/sign-up", json={"username": "budget", "password": "plain"})
+    client.post("/todos/bulk", json={"todos": [{"contents": "todo", "is_done": False}] * 3}, headers=headers)
+    client.post("/users/email/otp", json={"email": "a@b.com"}, headers=headers)
+    get_token_cache().clear() # 인증 유저 조회 쿼리까지 budget에 포함
+    client.cookies.clear() # 쓰기 직후의 primary 고정(read-your-writes) 해제
+    return headers
+
+
+@pytest.mark.parametrize("method, path, body, budget", BUDGETS, ids=[f"{m} {p}" for m, p, _, _ in BUDGETS])
+def test_query_budget(client, seeded, query_budget, method, path, body, budget):
+    with query_budget(budget, name=f"{method} {path}"):
+        response = client.request(method, path, json=body, headers=seeded)
+    assert response.status_code < 400, response.text
+
+
+def test_query_budget_failure_lists_statements(client, seeded, query_budget):
+    with pytest.raises(pytest.fail.Exception) as e:
+        with query_budget(0, name="GET /todos"):
+            client.get("/todos", headers=seeded)
+    assert "GET /todos issued 2 queries (budget 0)" in str(e.value)
+    assert "JOIN todo" in str(e.value)
+
+
+def test_replica_queries_counted(client, seeded, query_budget):
+    # export는 유저 조회, todo 조회 모두 replica
+    with query_budget(2) as counter:
+        assert client.get("/todos/export", headers=seeded).status_code == 200
+    assert len(counter.statements) == 2
@@ -0,0 +1,73 @@
+import fakeredis
+import pytest
+
+import cache
+from database.orm import User
+from ratelimit import LocalTokenBucket, hit, local_buckets
+from service.user import UserService
+
+
+@pytest.fixture(autouse=True)
+def clear_local_buckets():
+    local_buckets.clear()
+
+
+@pytest.fixture
+def client(app_client):
+    return app_client(rate_limit_ip_per_minute=5, rate_limit_user_per_minute=2)
+
+
+def test_log_in_rate_limited_before_hashing(client, db, mocker):
+    verify_password = mocker.patch.object(UserService, "verify_password", return_value=False)
+    mocker.patch("database.repository.UserRepository.get_user_by_username", return_value=User(id=1, username="test", password="hashed"))
+
+    body = {"username": "Test", "password": "plain"}
+    assert [client.post("/users/log-in", json=body).status_code for _ in range(2)] == [401, 401]
+
+    # 같은 username (대소문자 무관) -> 429, 해싱/검증 없이 거절
+    response = client.post("/users/log-in", json={"username": "test", "password": "plain"})
+    assert response.status_code == 429
+    assert 1 <= int(response.headers["Retry-After"]) <= 30
+    assert verify_password.call_count == 2
+
+    # 다른 username은 ip 한도(5)까지 허용
+    statuses = [client.post("/users/log-in", json={"username": f"u{i}", "password": "p"}).status_code for i in range(3)]
+    assert statuses == [401, 401, 429]
+
+
+
+def test_app_settings(app_client, mocker):
+    # 전역 settings가 아니라 create_app(settings)에 넘긴 app.state.settings를 사용
+    mocker.patch.object(UserService, "verify_password", return_value=False)
+    mocker.patch("database.repository.UserRepository.get_user_by_username", return_value=None)
+    client = app_client(rate_limit_enabled=False)
+
+    body = {"username": "test", "password": "plain"}
+    assert {client.post("/users/log-in", json=body).status_code for _ in range(6)} == {404}
+
+@pytest.mark.anyio
+async def test_token_bucket_script(redis):
+    assert [await hit("k", capacity=2, rate=1) for _ in range(2)] == [None, None]
+    retry_after = await hit("k", capacity=2, rate=1)
+    assert 0 < retry_after <= 1
+    assert 0 < await redis.pttl("ratelimit:k") <= 2000
+
+
+@pytest.mark.anyio
+async def test_fallback_when_redis_down(monkeypatch):
+    monkeypatch.setattr(cache, "redis_client", fakeredis.FakeAsyncRedis(connected=False))
+    assert await hit("k", capacity=1, rate=1) is None
+    assert await hit("k", capacity=1, rate=1) is not None
+
+
+def test_local_token_bucket(mocker):
+    now = mocker.patch("ratelimit.time.monotonic", return_value=100.0)
+    bucket = LocalTokenBucket(maxsize=2)
+    assert bucket.hit("a", capacity=1, rate=0.5) is None
+    assert bucket.hit("a", capacity=1, rate=0.5) == 2.0
+    now.return_value = 102.0 # 2초 후 1개 채워짐
+    assert bucket.hit("a", capacity=1, rate=0.5) is None
+
+    bucket.hit("b", capacity=1, rate=1)
+    bucket.hit("c", capacity=1, rate=1)
+    assert list(bucket._buckets) == ["b", "c"] # 오래된 key부터 제거
@@ -0,0 +1,153 @@
+import shutil
+
+import pytest
+from sqlalchemy import create_engine, insert, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import connection
+from database.orm import ToDo, User
+from cache import todo_cache
+from database.replica import ReadYourWrites, RoutingSession, read_your_writes
+from database.repository import AsyncToDoRepository, ToDoRepository
+
+
+@pytest.fixture
+def replica_path(headers, tmp_path):
+    # 유저만 있는 시점의 primary를 복사 -> 이후 primary에 쓴 데이터는 replica에 없음 (복제 지연)
+    path = tmp_path / "replica.db"
+    shutil.copy(connection.get_database().engine.url.database, path)
+    return path
+
+
+@pytest.fixture
+def replica_engine(replica_path):
+    engine = create_engine(f"sqlite:///{replica_path}")
+    yield engine
+    engine.dispose()
+
+
+def test_routing_session(replica_engine):
+    factory = sessionmaker(
+        class_=RoutingSession, primary=connection.get_database().engine, replica=replica_engine, expire_on_commit=False
+    )
+    with factory() as session:
+        todo = ToDoRepository(session).create_todo(ToDo(contents="a", is_done=False, user_id=1))
+        # 같은 session에서 쓴 뒤의 읽기 -> primary
+        assert ToDoRepository(session).get_todos_by_user(1, limit=10) == [todo]
+
+    with factory() as session:
+        # 새 session의 읽기 -> replica (아직 복제되지 않음)
+        assert ToDoRepository(session).get_todos_by_user(1, limit=10) == []
+        assert ToDoRepository(session).get_todos() == []
+        # 표시하지 않은 읽기 -> primary
+        assert ToDoRepository(session).get_todo_by_todo_id(todo.id) is not None
+
+    token = read_your_writes.set(ReadYourWrites(sticky=True))
+    try:
+        with factory() as session:
+            assert len(ToDoRepository(session).get_todos_by_user(1, limit=10)) == 1
+    finally:
+        read_your_writes.reset(token)
+
+
+@pytest.mark.anyio
+async def test_routing_async_session(replica_path):
+    replica = create_async_engine(f"sqlite+aiosqlite:///{replica_path}")
+    factory = async_sessionmaker(
+        sync_session_class=RoutingSession,
+        primary=connection.get_database().async_engine.sync_engine, replica=replica.sync_engine,
+        expire_on_commit=False,
+    )
+    async with factory() as session:
+        todo = await AsyncToDoRepository(session).create_todo(ToDo(contents="a", is_done=False, user_id=1))
+    async with factory() as session:
+        assert await AsyncToDoRepository(session).get_todos_by_user(1, limit=10) == []
+        rows = [row async for batch in AsyncToDoRepository(session).iter_todo_rows_by_user(1, 10) for row in batch]
+        assert rows == []
+    await replica.dispose()
+
+
+@pytest.fixture(params=[True, False], ids=["async", "sync"])
+def routed(request, replica_engine, replica_path, monkeypatch) -> bool:
+    # 앱의 session을 primary(conftest DB) + replica(복제 지연된 복사본) 라우팅으로 교체, db_async 반환
+    replica = create_async_engine(f"sqlite+aiosqlite:///{replica_path}")
+    database = connection.get_database()
+    monkeypatch.setattr(database, "async_session_factory", async_sessionmaker(
+        sync_session_class=RoutingSession,
+        primary=database.async_engine.sync_engine, replica=replica.sync_engine,
+        expire_on_commit=False,
+    ))
+    monkeypatch.setattr(database, "session_factory", sessionmaker(
+        class_=RoutingSession, primary=database.engine, replica=replica_engine, expire_on_commit=False,
+    ))
+    return request.param
+
+
+def test_read_your_writes(app_client, headers, routed):
+    client = app_client(db_async=routed, replica_sticky_seconds=2)
+    response = client.post("/todos/bulk", json={"todos": [{"contents": "a", "is_done": False}]}, headers=headers)
+    assert response.status_code == 201
+    assert "db_primary_until" in response.headers["set-cookie"]
+    assert "Max-Age=2;" in response.headers["set-cookie"]
+
+    # 쓰기 직후 같은 클라이언트(cookie) -> primary에서 읽음
+    assert client.get("/todos/export", headers=headers).text.count("\n") == 1
+
+    # cookie가 없는 클라이언트 -> replica (복제 전이므로 비어 있음)
+    client.cookies.clear()
+    response = client.get("/todos/export", headers=headers)
+    assert response.text == ""
+    assert "set-cookie" not in response.headers
+
+
+@pytest.mark.parametrize("cache_enabled", [True, False])
+def test_etag_not_stale(app_client, headers, routed, cache_enabled):
+    # 다른 기기(cookie 없음)가 쓰기 직후 조회해도 새 ETag에는 새 데이터
+    # (replica가 버전의 seq까지 복제되지 않았으므로 primary에서 읽음)
+    client = app_client(db_async=routed, todo_cache_enabled=cache_enabled)
+    client.post("/todos/bulk", json={"todos": [{"contents": "a", "is_done": False}]}, headers=headers)
+    client.cookies.clear()
+
+    for path, body in (("/todos", {"todos": [{"id": 1, "contents": "a", "is_done": False}], "next_cursor": None}),
+                       ("/todos/1", {"id": 1, "contents": "a", "is_done": False})):
+        response = client.get(path, headers=headers)
+        assert response.status_code == 200
+        assert response.json() == body
+        etag = response.headers["ETag"]
+        assert client.get(path, headers={**headers, "If-None-Match": etag}).status_code == 304
+
+
+def test_cache_fill_not_stale(app_client, headers, routed):
+    # 쓰기 직후 cookie 없는 클라이언트의 조회가 새 버전 키에 이전 데이터를 저장하지 않음
+    client = app_client(db_async=routed, todo_cache_enabled=True)
+    client.post("/todos/bulk", json={"todos": [{"contents": "milk", "is_done": False}]}, headers=headers)
+    client.cookies.clear()
+
+    hits = todo_cache.hits
+    for _ in range(2): # 두번째는 캐시에서
+        assert [todo["id"] for todo in client.get("/todos", headers=headers).json()["todos"]] == [1]
+        assert [todo["id"] for todo in client.get("/todos/search", params={"q": "milk"}, headers=headers).json()["todos"]] == [1]
+        assert client.get("/todos/1", headers=headers).status_code == 200
+    assert todo_cache.hits - hits == 3
+
+
+def test_reads_replica_when_caught_up(app_client, headers, routed, replica_engine):
+    # 버전에 반영된 쓰기(seq)가 replica에 복제되어 있으면 GET /todos, /todos/{id}는 replica에서 읽음
+    client = app_client(db_async=routed)
+    client.post("/todos/bulk", json={"todos": [{"contents": "a", "is_done": False}]}, headers=headers)
+    client.cookies.clear()
+    assert client.get("/todos", headers=headers).json()["todos"][0]["contents"] == "a" # 복제 전 -> primary
+
+    # 복제 (replica에서 읽었는지 구분하도록 내용만 다르게)
+    with replica_engine.begin() as conn:
+        conn.execute(insert(ToDo).values(id=1, contents="a (replica)", is_done=False, user_id=1, seq=1))
+        conn.execute(update(User).where(User.id == 1).values(todo_seq=1))
+    assert client.get("/todos", headers=headers).json()["todos"][0]["contents"] == "a (replica)"
+    assert client.get("/todos/1").json()["contents"] == "a (replica)"
+
+    # 복제되지 않은 쓰기 이후 -> 다시 primary
+    client.patch("/todos/1", json={"is_done": True})
+    client.cookies.clear()
+    assert client.get("/todos", headers=headers).json()["todos"] == [{"id": 1, "contents": "a", "is_done": True}]
+    assert client.get("/todos/1").json() == {"id": 1, "contents": "a", "is_done": True}
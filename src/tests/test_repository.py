@@ -0,0 +1,98 @@
+import pytest
+
+from database.connection import get_database
+from database.orm import ToDo, User
+from database.repository import AsyncToDoRepository, AsyncUserRepository, ToDoRepository
+from schema.request import CreateToDoRequest
+from tests.query_budget import QueryCounter
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("db_async", [True, False])
+async def test_async_repository(db, db_async):
+    # aiosqlite(AsyncSession)와 동기 Session(threadpool) 경로 모두 검증
+
+    async with get_database().async_session_factory() as async_session:
+        session = async_session if db_async else get_database().session_factory()
+
+        user_repo = AsyncUserRepository(session=session)
+        user: User = await user_repo.save_user(
+            user=User.create(username="test", hashed_password="hashed")
+        )
+        assert user.id is not None
+        assert (await user_repo.get_user_by_username(username="test")).id == user.id
+
+        todo_repo = AsyncToDoRepository(session=session)
+        todo: ToDo = ToDo.create(request=CreateToDoRequest(contents="todo", is_done=False))
+        todo.user_id = user.id
+        todo = await todo_repo.create_todo(todo=todo)
+        assert todo.id is not None
+
+        todo.done()
+        todo = await todo_repo.update_todo(todo=todo)
+        assert (await todo_repo.get_todo_by_todo_id(todo_id=todo.id)).is_done is True
+        assert [t.id for t in await todo_repo.get_todos()] == [todo.id]
+
+        todo = await todo_repo.update_todo_is_done(todo_id=todo.id, is_done=False)
+        assert todo.is_done is False
+        assert await todo_repo.update_todo_is_done(todo_id=todo.id + 1, is_done=True) is None
+
+        assert (await todo_repo.delete_todo(todo_id=todo.id)).id == todo.id
+        assert await todo_repo.get_todo_by_todo_id(todo_id=todo.id) is None
+        assert await todo_repo.delete_todo(todo_id=todo.id) is None
+
+
+@pytest.mark.anyio
+async def test_get_todos_by_user(db):
+    async with get_database().async_session_factory() as session:
+        user: User = await AsyncUserRepository(session=session).save_user(
+            user=User.create(username="test", hashed_password="hashed")
+        )
+        todo_repo = AsyncToDoRepository(session=session)
+        for i in range(5):
+            todo: ToDo = ToDo.create(request=CreateToDoRequest(contents=f"todo {i}", is_done=False))
+            todo.user_id = user.id
+            await todo_repo.create_todo(todo=todo)
+
+        page = await todo_repo.get_todos_by_user(user_id=user.id, limit=2)
+        assert [t.id for t in page] == [1, 2]
+        page = await todo_repo.get_todos_by_user(user_id=user.id, limit=2, cursor=page[-1].id)
+        assert [t.id for t in page] == [3, 4]
+        page = await todo_repo.get_todos_by_user(user_id=user.id, limit=2, cursor=4, desc=True)
+        assert [t.id for t in page] == [3, 2]
+        assert await todo_repo.get_todos_by_user(user_id=user.id + 1, limit=2) == []
+
+
+
+def test_create_todos_without_returning(db, monkeypatch):
+    # MySQL 경로(RETURNING 없음): id가 연속이 아니어도 (동시 INSERT, auto_increment_increment > 1) 정확한 row 반환
+    with get_database().session_factory() as session:
+        session.add(User.create(username="test", hashed_password="hashed"))
+        session.commit()
+        # 짝수 id 다음에 다른 INSERT가 끼어든 것처럼 id를 건너뜀
+        session.connection().exec_driver_sql(
+            "CREATE TRIGGER interleave AFTER INSERT ON todo WHEN NEW.user_id IS NOT NULL AND NEW.id % 2 = 0 "
+            "BEGIN INSERT INTO todo (contents, is_done, seq) VALUES ('other', 0, 0); END"
+        )
+        monkeypatch.setattr(session.get_bind().dialect, "insert_executemany_returning", False)
+
+        todos = [ToDo(contents=f"todo {i}", is_done=i == 1, user_id=1) for i in range(3)]
+        todos.insert(1, ToDo(contents="no user", is_done=False))
+        created = ToDoRepository(session=session).create_todos(todos=todos)
+
+        assert [(t.id, t.contents, t.is_done, t.seq) for t in created] == [
+            (1, "todo 0", False, 1), (6, "no user", False, 0), (2, "todo 1", True, 2), (4, "todo 2", False, 3),
+        ]
+
+def test_changes_query_uses_index(db):
+    # 변경분 조회는 (user_id, seq) 인덱스 range scan, 정렬도 인덱스 순서 (전체 todo를 읽지 않음)
+    with get_database().session_factory() as session:
+        with QueryCounter() as counter:
+            ToDoRepository(session=session).get_changes_by_user(user_id=1, since=10, limit=100)
+        plan = " ".join(
+            str(row) for row in session.connection().exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {counter.statements[0]}", (1, 10, 100, 0) # LIMIT ? OFFSET ?
+            )
+        )
+    assert "USING INDEX ix_todo_user_id_seq" in plan
+    assert "TEMP B-TREE" not in plan
@@ -0,0 +1,48 @@
+import time
+
+from database.orm import User
+from database.repository import ToDoRepository, UserRepository
+from security import TokenCache
+from schema.response import UserSchema
+from service.user import UserService
+
+
+def test_get_current_user_is_cached(client, mocker):
+    access_token: str = UserService().create_jwt(username="test")
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    get_user = mocker.patch.object(
+        UserRepository,
+        "get_user_by_username",
+        return_value = User(id=1, username="test", password="hashed"))
+    mocker.patch.object(ToDoRepository, "get_todo_rows_by_user", return_value=(0, []))
+    decode = mocker.spy(UserService, "decode_jwt_claims")
+
+    for _ in range(3):
+        response = client.get("/todos", headers=headers)
+        assert response.status_code == 200
+
+    get_user.assert_called_once_with(username="test")
+    assert decode.call_count == 1
+
+
+def test_get_current_user_invalid_token(client):
+    response = client.get("/todos", headers={"Authorization": "Bearer invalid"})
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Not Authorized"}
+
+
+def test_token_cache_eviction():
+    cache = TokenCache(maxsize=2, ttl=60)
+    user = UserSchema(id=1, username="test")
+
+    cache.set("expired", user, exp=time.time() - 1)
+    assert cache.get("expired") is None
+
+    cache.set("a", user, exp=time.time() + 60)
+    cache.set("b", user, exp=time.time() + 60)
+    cache.get("a") # a를 최근 사용으로
+    cache.set("c", user, exp=time.time() + 60)
+    assert cache.get("b") is None
+    assert cache.get("a") == user
+    assert cache.get("c") == user
@@ -0,0 +1,60 @@
+import pytest
+import redis.asyncio as redis
+
+from database.orm import ToDo
+from database.repository import ToDoRepository
+from stats import todo_stats
+from todo_events import todo_event
+
+
+@pytest.mark.parametrize("db_async", [True, False])
+def test_todo_stats(app_client, headers, mocker, db_async):
+    client = app_client(db_async=db_async)
+    client.post("/todos/bulk", json={"todos": [
+        {"contents": "a", "is_done": True}, {"contents": "b", "is_done": False}, {"contents": "c", "is_done": False},
+    ]}, headers=headers)
+    lock = mocker.spy(ToDoRepository, "lock_todo_counts")
+
+    # 최초 조회: SQL 집계로 채움
+    assert client.get("/todos/stats", headers=headers).json() == {"total": 3, "done": 1, "pending": 2}
+    assert lock.call_count == 1
+
+    # 이후 쓰기는 증감으로 반영, 조회시 집계 없음
+    client.patch("/todos/2", json={"is_done": True})
+    client.patch("/todos/2", json={"is_done": True}) # 같은 값 -> 변화 없음
+    client.delete("/todos/1")
+    client.post("/todos/bulk", json={"todos": [{"contents": "d", "is_done": True}]}, headers=headers)
+    client.patch("/todos/bulk", json={"todos": [{"id": 3, "is_done": True}, {"id": 4, "is_done": False}]}, headers=headers)
+    client.request("DELETE", "/todos/bulk", json={"ids": [2, 99]}, headers=headers)
+    assert client.get("/todos/stats", headers=headers).json() == {"total": 2, "done": 1, "pending": 1}
+    assert lock.call_count == 1
+
+    # refresh: 집계 결과와 같음
+    assert client.get("/todos/stats", params={"refresh": True}, headers=headers).json() == {
+        "total": 2, "done": 1, "pending": 1,
+    }
+    assert lock.call_count == 2
+
+
+@pytest.mark.anyio
+async def test_stats_ignores_events_in_snapshot():
+    # 집계 시점(seq=5)까지의 변경은 이미 포함 -> 늦게 도착한 이벤트는 무시
+    await todo_stats.set(1, seq=5, counts={"total": 3, "done": 1})
+    await todo_stats.apply([
+        todo_event("created", ToDo(id=5, contents="a", is_done=True, user_id=1, seq=5)),
+        todo_event("deleted", ToDo(id=6, contents="b", is_done=False, user_id=1, seq=6)),
+        todo_event("updated", ToDo(id=7, contents="c", is_done=True, user_id=1, seq=7), was_done=False),
+    ])
+    assert await todo_stats.get(1) == {"total": 2, "done": 2}
+
+    # 통계가 없는 유저는 증감하지 않음 (다음 조회에서 집계)
+    await todo_stats.apply([todo_event("created", ToDo(id=8, contents="a", is_done=True, user_id=2, seq=1))])
+    assert await todo_stats.get(2) is None
+
+
+def test_stats_redis_error(client, headers, mocker):
+    # redis 장애: 매번 SQL 집계
+    client_mock = mocker.patch("stats.get_redis").return_value
+    client_mock.hmget.side_effect = client_mock.pipeline.side_effect = redis.ConnectionError
+    client.post("/todos/bulk", json={"todos": [{"contents": "a", "is_done": False}]}, headers=headers)
+    assert client.get("/todos/stats", headers=headers).json() == {"total": 1, "done": 0, "pending": 1}
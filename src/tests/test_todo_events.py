@@ -0,0 +1,140 @@
+import asyncio
+import json
+
+import pytest
+
+import todo_events
+from api.events import todo_events_handler
+from config import settings
+from database.connection import get_database, pool_status
+from database.orm import ToDo
+from database.repository import AsyncToDoRepository
+from schema.response import UserSchema
+from todo_events import InProcessBroker, RedisBroker, close_broker, init_broker
+
+
+@pytest.fixture
+def broker(monkeypatch):
+    monkeypatch.setattr(todo_events, "broker", InProcessBroker(queue_size=settings.todo_events_queue_size))
+    return todo_events.broker
+
+
+async def next_event(queue: asyncio.Queue) -> dict:
+    return await asyncio.wait_for(queue.get(), timeout=1)
+
+
+@pytest.mark.anyio
+async def test_repository_publishes_events(headers, broker):
+    async with get_database().async_session_factory() as session, broker.subscribe(1) as queue:
+        todo_repo = AsyncToDoRepository(session)
+        created = await todo_repo.create_todos([ToDo(contents="a", is_done=False, user_id=1)])
+        await todo_repo.update_todo_is_done(todo_id=created[0].id, is_done=True)
+        await todo_repo.delete_todos(user_id=1, todo_ids=[created[0].id])
+        await todo_repo.create_todo(ToDo(contents="no user", is_done=False)) # user 없는 todo는 전송 안함
+
+        assert await next_event(queue) == {
+            "type": "created", "user_id": 1, "id": 1, "todo": {"id": 1, "contents": "a", "is_done": False}, "seq": 1,
+            "was_done": None,
+        }
+        updated = await next_event(queue)
+        assert updated["todo"]["is_done"] is True and updated["seq"] == 2 and updated["was_done"] is False
+        assert await next_event(queue) == {
+            "type": "deleted", "user_id": 1, "id": 1, "todo": None, "seq": 3, "was_done": True,
+        }
+        assert queue.empty()
+
+
+@pytest.mark.anyio
+async def test_sse_stream(broker):
+    response = await todo_events_handler(user=UserSchema(id=1, username="test"), settings=settings)
+    assert response.media_type == "text/event-stream"
+    stream = response.body_iterator
+
+    assert await anext(stream) == b"retry: 3000\n\n"
+    await broker.publish(1, [todo_events.resync_event(1)])
+    frame = await anext(stream)
+    assert frame.startswith(b"event: resync\ndata: ")
+    assert json.loads(frame.split(b"data: ")[1]) == {
+        "type": "resync", "user_id": 1, "id": None, "todo": None, "seq": None, "was_done": None,
+    }
+
+    # 서버 종료시 스트림 종료
+    next_frame = asyncio.ensure_future(anext(stream))
+    await asyncio.sleep(0)
+    await close_broker()
+    with pytest.raises(StopAsyncIteration):
+        await next_frame
+
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("db_async", [True, False])
+async def test_sse_stream_releases_connection(headers, broker, app_client, db_async):
+    # 스트림이 열려 있는 동안 DB 커넥션을 잡고 있지 않음 (인증 캐시 miss -> 유저 조회 후 바로 반납)
+    app = app_client(db_async=db_async).app
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/todos/events", "raw_path": b"/todos/events", "query_string": b"",
+        "root_path": "", "headers": [(b"authorization", headers["Authorization"].encode())],
+        "client": ("testclient", 123), "server": ("testserver", 80),
+    }
+    requests = [{"type": "http.request", "body": b"", "more_body": False}]
+    disconnected = asyncio.Event()
+    messages: asyncio.Queue = asyncio.Queue()
+
+    async def receive() -> dict:
+        if requests:
+            return requests.pop()
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    response = asyncio.ensure_future(app(scope, receive, messages.put))
+    assert (await next_event(messages))["status"] == 200
+    assert (await next_event(messages))["body"] == b"retry: 3000\n\n"
+    pools = get_database().pools()
+    assert {name: pool_status(engine)["checked_out"] for name, engine in pools.items()} == dict.fromkeys(pools, 0)
+
+    disconnected.set()
+    await close_broker()
+    await asyncio.wait_for(response, timeout=1)
+
+@pytest.mark.anyio
+async def test_sse_keep_alive(broker):
+    app_settings = settings.model_copy(update={"todo_events_heartbeat": 0.01})
+    stream = (await todo_events_handler(user=UserSchema(id=1, username="test"), settings=app_settings)).body_iterator
+    await anext(stream)
+    assert await anext(stream) == b": keep-alive\n\n"
+    await stream.aclose()
+    assert broker._subscribers == {}
+
+
+@pytest.mark.anyio
+async def test_slow_subscriber_resync():
+    broker = InProcessBroker(queue_size=2)
+    async with broker.subscribe(1) as queue:
+        events = [todo_events.todo_event("deleted", ToDo(id=i, user_id=1)) for i in range(3)]
+        await broker.publish(1, events)
+        assert await next_event(queue) == todo_events.resync_event(1)
+        assert queue.empty()
+
+
+@pytest.mark.anyio
+async def test_redis_broker_fan_out(redis):
+    # worker 2개: a에서 publish -> redis pub/sub -> b의 구독자
+    worker_a, worker_b = RedisBroker(queue_size=10), RedisBroker(queue_size=10)
+    event = todo_events.todo_event("deleted", ToDo(id=1, user_id=1))
+    async with worker_b.subscribe(1) as queue:
+        await worker_a.publish(2, [todo_events.todo_event("deleted", ToDo(id=2, user_id=2))]) # 구독 안한 유저
+        await worker_a.publish(1, [event])
+        assert await next_event(queue) == event
+        assert queue.empty()
+    assert await redis.pubsub_numsub(RedisBroker.channel(1)) == [(RedisBroker.channel(1), 0)]
+    await worker_a.close()
+    await worker_b.close()
+
+
+def test_init_broker(monkeypatch):
+    monkeypatch.setattr(todo_events, "broker", None)
+    broker = init_broker(settings.model_copy(update={"todo_events_broker": "redis", "todo_events_queue_size": 3}))
+    assert isinstance(broker, RedisBroker) and broker.queue_size == 3
+    assert type(init_broker(settings.model_copy(update={"todo_events_broker": "memory"}))) is InProcessBroker
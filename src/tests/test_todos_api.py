@@ -1,3 +1,6 @@
+import json
+
+import pytest
 from fastapi.testclient import TestClient
 
 from database.orm import ToDo
@@ -196,37 +199,59 @@ def test_get_todos(client, mocker):
         "Authorization": f"Bearer {access_token}"
     }
     
-    user = User(id=1, username="test", password="hashed")
-    user.todos = [
-        ToDo(id=1, contents="FastAPI Section 0", is_done = True),
-        ToDo(id=2, contents="FastAPI Section 1", is_done = False),
-    ]
-    
     mocker.patch.object(
         UserRepository, 
         "get_user_by_username", 
-        return_value = user)
+        return_value = User(id=1, username="test", password="hashed"))
+    get_todos = mocker.patch.object(
+        ToDoRepository,
+        "get_todo_rows_by_user",
+        return_value = (2, [
+            (1, "FastAPI Section 0", True),
+            (2, "FastAPI Section 1", False),
+        ]))
 
+    # (유저의 todo_seq, rows), 버전이 없으면 min_seq=0 (primary) -> 조회한 seq로 버전 생성
     response = client.get("/todos", headers=headers)
     
+    get_todos.assert_called_once_with(user_id=1, limit=101, cursor=None, desc=False, min_seq=0)
     assert response.status_code == 200
     assert response.json() == {
         "todos": [
             {"id": 1, "contents": "FastAPI Section 0", "is_done": True},
             {"id": 2, "contents": "FastAPI Section 1", "is_done": False},
-        ]
+        ],
+        "next_cursor": None,
     }    
 
-    # 역순 검증 order=DESC
+    # 역순 검증 order=DESC: 정렬은 DB(ORDER BY)에서
+    get_todos.return_value = (2, [
+        (2, "FastAPI Section 1", False),
+        (1, "FastAPI Section 0", True),
+    ])
     response = client.get("/todos?order=DESC", headers=headers) 
     
+    get_todos.assert_called_with(user_id=1, limit=101, cursor=None, desc=True, min_seq=2)
     assert response.status_code == 200
     assert response.json() == {
         "todos": [
             {"id": 2, "contents": "FastAPI Section 1", "is_done": False},
             {"id": 1, "contents": "FastAPI Section 0", "is_done": True},
-        ]
+        ],
+        "next_cursor": None,
     }    
+
+    # 페이지 검증: limit + 1개가 조회되면 다음 페이지가 있음
+    response = client.get("/todos?order=DESC&limit=1&cursor=3", headers=headers)
+
+    get_todos.assert_called_with(user_id=1, limit=2, cursor=3, desc=True, min_seq=2)
+    assert response.status_code == 200
+    assert response.json() == {
+        "todos": [
+            {"id": 2, "contents": "FastAPI Section 1", "is_done": False},
+        ],
+        "next_cursor": 2,
+    }
     
     
 def test_get_todo(client, mocker):
@@ -275,29 +300,22 @@ def test_create_todo(client, mocker):
     
 def test_update_todo(client, mocker):
     # 200
-    mocker.patch.object(
-        ToDoRepository, 
-        "get_todo_by_todo_id", 
-        return_value = ToDo(id=1, contents="todo", is_done=True))
-    
-    undone = mocker.patch.object(ToDo, "undone")
-    
-    mocker.patch.object(
+    update = mocker.patch.object(
         ToDoRepository, 
-        "update_todo", 
-        return_value = ToDo(id=1, contents="todo", is_done=False))
+        "update_todo_is_done", 
+        return_value = (ToDo(id=1, contents="todo", is_done=False), True))
     
     response = client.patch("/todos/1", json={"is_done": False})
     
-    undone.assert_called_once_with()
+    update.assert_called_once_with(todo_id=1, is_done=False)
     assert response.status_code == 200
     assert response.json() == {"id": 1, "contents": "todo", "is_done": False}
     
     # 404
     mocker.patch.object(
         ToDoRepository, 
-        "get_todo_by_todo_id", 
-        return_value = None)
+        "update_todo_is_done", 
+        return_value = (None, False))
     
     response = client.patch("/todos/1", json = {"is_done": True})
     assert response.status_code == 404
@@ -306,25 +324,152 @@ def test_update_todo(client, mocker):
     
 def test_delete_todo(client, mocker):
     # 204
-    mocker.patch.object(
-        ToDoRepository, 
-        "get_todo_by_todo_id", 
-        return_value = ToDo(id=1, contents="todo", is_done=True))
-    
-    mocker.patch.object(
+    delete = mocker.patch.object(
         ToDoRepository, 
         "delete_todo", 
-        return_value = None)
+        return_value = ToDo(id=1, contents="todo", is_done=True))
     
     response = client.delete("/todos/1")
+    delete.assert_called_once_with(todo_id=1)
     assert response.status_code == 204
     
     # 404
     mocker.patch.object(
         ToDoRepository, 
-        "get_todo_by_todo_id", 
+        "delete_todo", 
         return_value = None)
     
     response = client.delete("/todos/1")
     assert response.status_code == 404
-    assert response.json() == {"detail": "ToDo Not Found"}      
\ No newline at end of file
+    assert response.json() == {"detail": "ToDo Not Found"}      
+
+
+def test_bulk_todos(client, headers):
+    body = {"todos": [{"contents": f"todo {i}", "is_done": False} for i in range(3)]}
+    response = client.post("/todos/bulk", json=body, headers=headers)
+    assert response.status_code == 201
+    assert response.json() == {
+        "results": [
+            {"id": i, "status": 201, "todo": {"id": i, "contents": f"todo {i - 1}", "is_done": False}}
+            for i in (1, 2, 3)
+        ]
+    }
+
+    body = {"todos": [{"id": 1, "is_done": True}, {"id": 2, "is_done": False}, {"id": 9, "is_done": True}]}
+    response = client.patch("/todos/bulk", json=body, headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {
+        "results": [
+            {"id": 1, "status": 200, "todo": {"id": 1, "contents": "todo 0", "is_done": True}},
+            {"id": 2, "status": 200, "todo": {"id": 2, "contents": "todo 1", "is_done": False}},
+            {"id": 9, "status": 404, "todo": None},
+        ]
+    }
+
+    response = client.request("DELETE", "/todos/bulk", json={"ids": [1, 3, 9]}, headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {
+        "results": [
+            {"id": 1, "status": 204, "todo": None},
+            {"id": 3, "status": 204, "todo": None},
+            {"id": 9, "status": 404, "todo": None},
+        ]
+    }
+    response = client.get("/todos", headers=headers)
+    assert [todo["id"] for todo in response.json()["todos"]] == [2]
+
+
+@pytest.mark.parametrize("db_async", [True, False])
+def test_export_todos(app_client, headers, db_async):
+    client = app_client(db_async=db_async, todo_export_batch_size=2)
+    body = {"todos": [{"contents": f"todo {i}", "is_done": i % 2 == 0} for i in range(5)]}
+    client.post("/todos/bulk", json=body, headers=headers)
+
+    response = client.get("/todos/export", headers=headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in response.text.splitlines()] == [
+        {"id": i + 1, "contents": f"todo {i}", "is_done": i % 2 == 0} for i in range(5)
+    ]
+
+
+@pytest.mark.parametrize("cache_enabled", [True, False])
+def test_todos_etag(app_client, headers, mocker, cache_enabled):
+    client = app_client(todo_cache_enabled=cache_enabled)
+    client.post("/todos/bulk", json={"todos": [{"contents": "todo", "is_done": False}]}, headers=headers)
+
+    for path in ("/todos", "/todos/1"):
+        response = client.get(path, headers=headers)
+        etag = response.headers["ETag"]
+        assert response.headers["Cache-Control"] == "private, no-cache"
+
+        # 변경 없음 -> 304, todo 조회/직렬화 없음
+        get_rows = mocker.spy(ToDoRepository, "get_todo_rows_by_user")
+        get_todo = mocker.spy(ToDoRepository, "get_todo_by_todo_id")
+        response = client.get(path, headers={**headers, "If-None-Match": f'W/{etag}, "other"'})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+        assert get_rows.call_count == get_todo.call_count == 0
+        mocker.stopall()
+
+        # 수정하면 버전이 올라가서 새 ETag, 200
+        client.patch("/todos/1", json={"is_done": path == "/todos"})
+        response = client.get(path, headers={**headers, "If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    client.delete("/todos/1")
+    response = client.get("/todos/1", headers={"If-None-Match": etag})
+    assert response.status_code == 404
+
+
+def test_todo_changes(client, headers):
+    client.post("/todos/bulk", json={"todos": [{"contents": f"todo {i}", "is_done": False} for i in range(3)]}, headers=headers)
+    response = client.get("/todos/changes", headers=headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert [(change["id"], change["seq"], change["deleted"]) for change in body["changes"]] == [
+        (1, 1, False), (2, 2, False), (3, 3, False),
+    ]
+    assert body["next_since"] == 3 and body["has_more"] is False
+
+    # since 이후의 변경만, 삭제는 deleted=True로 전달되고 목록에서는 제외
+    client.patch("/todos/2", json={"is_done": True})
+    client.delete("/todos/1")
+    body = client.get("/todos/changes", params={"since": 3, "limit": 1}, headers=headers).json()
+    assert [(change["id"], change["is_done"], change["seq"]) for change in body["changes"]] == [(2, True, 4)]
+    assert body["has_more"] is True
+    body = client.get("/todos/changes", params={"since": body["next_since"]}, headers=headers).json()
+    assert [(change["id"], change["seq"], change["deleted"]) for change in body["changes"]] == [(1, 5, True)]
+    assert body["next_since"] == 5 and body["has_more"] is False
+    assert [todo["id"] for todo in client.get("/todos", headers=headers).json()["todos"]] == [2, 3]
+    assert client.get("/todos/1").status_code == 404
+    assert client.delete("/todos/1").status_code == 404
+
+    body = client.get("/todos/changes", params={"since": 5}, headers=headers).json()
+    assert body == {"changes": [], "next_since": 5, "has_more": False}
+
+
+def test_search_todos(client, headers):
+    contents = ["buy milk", "buy bread and milk", "call mom", "milk the cows, buy milk powder"]
+    client.post("/todos/bulk", json={"todos": [{"contents": c, "is_done": False} for c in contents]}, headers=headers)
+
+    # 검색어가 더 많이, 더 짧은 내용에 포함될수록 앞에
+    response = client.get("/todos/search", params={"q": "Milk buy"}, headers=headers)
+    assert response.status_code == 200
+    assert [todo["id"] for todo in response.json()["todos"]] == [1, 4, 2]
+    assert response.json()["next_offset"] is None
+
+    body = client.get("/todos/search", params={"q": "milk", "limit": 2}, headers=headers).json()
+    assert len(body["todos"]) == 2 and body["next_offset"] == 2
+    body = client.get("/todos/search", params={"q": "milk", "limit": 2, "offset": 2}, headers=headers).json()
+    assert len(body["todos"]) == 1 and body["next_offset"] is None
+
+    # 삭제된 todo 제외, MATCH 문법 문자는 무시
+    client.delete("/todos/1")
+    body = client.get("/todos/search", params={"q": '"buy" (milk* -'}, headers=headers).json()
+    assert [todo["id"] for todo in body["todos"]] == [4, 2]
+    assert client.get("/todos/search", params={"q": "..."}, headers=headers).json()["todos"] == []
+    assert client.get("/todos/search", params={"q": ""}, headers=headers).status_code == 422
@@ -1,6 +1,7 @@
 from service.user import UserService
 from database.orm import User
 from database.repository import UserRepository
+from jobs import JobQueue
 
 
 def test_user_sign_up(client, mocker):
@@ -37,4 +38,59 @@ def test_user_sign_up(client, mocker):
         hashed_password="hashed"
     )
     assert response.status_code == 201
-    assert response.json() == {"id": 1, "username": "test"}
\ No newline at end of file
+    assert response.json() == {"id": 1, "username": "test"}
+
+
+def test_user_sign_up_duplicate_username(client, db, mocker):
+    # username unique index -> 409
+    mocker.patch("service.user.UserService.hash_password", return_value="hashed")
+    assert client.post("/users/sign-up", json={"username": "a", "password": "p"}).status_code == 201
+    response = client.post("/users/sign-up", json={"username": "a", "password": "p"})
+    assert response.status_code == 409
+
+
+def test_user_log_in_rehash(client, mocker):
+    mocker.patch.object(
+        UserRepository,
+        "get_user_by_username",
+        return_value = User(id=1, username="test", password="$2b$04$old")
+    )
+    mocker.patch.object(UserService, "verify_password", return_value=True)
+    mocker.patch.object(UserService, "hash_password", return_value="$2b$12$new")
+    update_password = mocker.patch.object(UserRepository, "update_password")
+
+    response = client.post("/users/log-in", json={"username": "test", "password": "plain"})
+
+    assert response.status_code == 200
+    update_password.assert_called_once_with(user_id=1, hashed_password="$2b$12$new")
+
+
+def test_otp_flow(client, mocker, redis):
+    access_token: str = UserService().create_jwt(username="test")
+    headers = {"Authorization": f"Bearer {access_token}"}
+    mocker.patch.object(
+        UserRepository,
+        "get_user_by_username",
+        return_value = User(id=1, username="test", password="hashed")
+    )
+    mocker.patch.object(UserService, "create_otp", return_value=1234)
+    enqueue = mocker.patch.object(JobQueue, "enqueue")
+
+    response = client.post("/users/email/otp", json={"email": "a@b.com"}, headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"otp": 1234}
+
+    # 틀린 otp
+    body = {"email": "a@b.com", "otp": 1111}
+    response = client.post("/users/email/otp/verify", json=body, headers=headers)
+    assert response.status_code == 400
+
+    # 맞는 otp는 한번만 사용 가능
+    body = {"email": "a@b.com", "otp": 1234}
+    response = client.post("/users/email/otp/verify", json=body, headers=headers)
+    assert response.status_code == 200
+    assert response.json() == {"id": 1, "username": "test"}
+    enqueue.assert_called_once_with("admin@fastapi.com")
+
+    response = client.post("/users/email/otp/verify", json=body, headers=headers)
+    assert response.status_code == 400
@@ -0,0 +1,243 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Awaitable, Callable, List, Literal, TypedDict
+
+import anyio
+import redis.asyncio as redis
+from pydantic import TypeAdapter
+
+from cache import get_redis, todo_cache
+from config import Settings, settings
+from database.orm import ToDo
+from schema.response import ToDoRow
+
+logger = logging.getLogger(__name__)
+
+
+# todo 변경 이벤트: AsyncToDoRepository의 생성/수정/삭제 후 dispatch -> 등록된 listener들이 처리
+# (캐시 무효화, 변경 스트림 전송 등)
+class ToDoEvent(TypedDict):
+    type: Literal["created", "updated", "deleted", "resync"] # resync: 놓친 이벤트가 있을 수 있으니 다시 조회
+    user_id: int | None
+    id: int | None
+    todo: ToDoRow | None # deleted, resync는 None
+    seq: int | None # 변경 번호, 재연결/resync 후 GET /todos/changes?since=seq로 이어서 조회
+    was_done: bool | None # 변경 전 is_done (created, resync는 None), 통계 증감 계산용 (stats.py)
+
+
+event_adapter = TypeAdapter(ToDoEvent)
+events_adapter = TypeAdapter(List[ToDoEvent])
+
+
+def todo_event(type: str, todo: ToDo, was_done: bool | None = None) -> ToDoEvent:
+    # deleted의 was_done은 삭제된 todo의 is_done
+    row: ToDoRow | None = (
+        None if type == "deleted"
+        else {"id": todo.id, "contents": todo.contents, "is_done": todo.is_done}
+    )
+    if type == "deleted":
+        was_done = todo.is_done
+    return {
+        "type": type, "user_id": todo.user_id, "id": todo.id, "todo": row, "seq": todo.seq, "was_done": was_done,
+    }
+
+
+def resync_event(user_id: int) -> ToDoEvent:
+    return {"type": "resync", "user_id": user_id, "id": None, "todo": None, "seq": None, "was_done": None}
+
+
+Listener = Callable[[List[ToDoEvent]], Awaitable[None]]
+listeners: List[Listener] = []
+
+
+def on_todo_change(listener: Listener) -> Listener:
+    # 등록 순서대로 실행
+    listeners.append(listener)
+    return listener
+
+
+async def dispatch(events: List[ToDoEvent]) -> None:
+    # 쓰기는 이미 commit 되었으므로 listener 실패는 로그만 남기고 요청은 성공 처리
+    if not events:
+        return
+    for listener in listeners:
+        try:
+            await listener(events)
+        except Exception:
+            logger.exception("todo event listener %s failed", listener.__name__)
+
+
+class InProcessBroker:
+    # 유저별 구독자(SSE 연결) queue로 이벤트 전달, 같은 프로세스 안에서만 (테스트, 단일 worker)
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size # 구독자별로 밀린 이벤트를 쌓아두는 최대 개수
+        self._subscribers: dict[int, set[asyncio.Queue]] = {}
+
+    async def publish(self, user_id: int, events: List[ToDoEvent]) -> None:
+        self._deliver(user_id, events)
+
+    def _deliver(self, user_id: int, events: List[ToDoEvent]) -> None:
+        for queue in self._subscribers.get(user_id, ()):
+            for event in events:
+                try:
+                    queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    # 느린 구독자: 밀린 이벤트를 버리고 다시 조회하도록 resync 하나만 남김
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait(resync_event(user_id))
+                    break
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: int) -> AsyncIterator[asyncio.Queue]:
+        # queue에서 ToDoEvent를 꺼내 사용, None이면 서버 종료
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        subscribers = self._subscribers.setdefault(user_id, set())
+        subscribers.add(queue)
+        if len(subscribers) == 1:
+            await self._on_first_subscriber(user_id)
+        try:
+            yield queue
+        finally:
+            subscribers.discard(queue)
+            if not subscribers and self._subscribers.get(user_id) is subscribers:
+                del self._subscribers[user_id]
+                # 연결 종료(취소) 중에도 정리가 끝나도록
+                with anyio.CancelScope(shield=True):
+                    await self._on_last_unsubscribe(user_id)
+
+    async def _on_first_subscriber(self, user_id: int) -> None:
+        pass
+
+    async def _on_last_unsubscribe(self, user_id: int) -> None:
+        pass
+
+    async def close(self) -> None:
+        # 열린 스트림 종료 (graceful shutdown이 SSE 연결 때문에 지연되지 않도록)
+        for queues in self._subscribers.values():
+            for queue in queues:
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+
+class RedisBroker(InProcessBroker):
+    # worker 간 fan-out: PUBLISH todos:{user_id}:events
+    # worker마다 pubsub 커넥션 하나로, 로컬 구독자가 있는 유저 채널만 SUBSCRIBE -> 로컬 queue로 전달
+    def __init__(self, queue_size: int):
+        super().__init__(queue_size)
+        self._pubsub = None
+        self._listener: asyncio.Task | None = None
+
+    @staticmethod
+    def channel(user_id: int) -> str:
+        return f"todos:{user_id}:events"
+
+    async def publish(self, user_id: int, events: List[ToDoEvent]) -> None:
+        try:
+            await get_redis().publish(self.channel(user_id), events_adapter.dump_json(events))
+        except redis.RedisError:
+            # 다른 worker에는 전달되지 않지만 같은 worker의 구독자에게는 전달
+            logger.warning("todo event publish failed: user %s", user_id, exc_info=True)
+            self._deliver(user_id, events)
+
+    async def _on_first_subscriber(self, user_id: int) -> None:
+        try:
+            if self._pubsub is None:
+                self._pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+            await self._pubsub.subscribe(self.channel(user_id))
+        except redis.RedisError:
+            # 스트림은 유지 (같은 worker의 이벤트만), listener가 재연결하면서 다시 SUBSCRIBE
+            logger.warning("todo event subscribe failed: user %s", user_id, exc_info=True)
+            self._pubsub = None
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def _on_last_unsubscribe(self, user_id: int) -> None:
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.unsubscribe(self.channel(user_id))
+            except redis.RedisError:
+                logger.warning("todo event unsubscribe failed: user %s", user_id, exc_info=True)
+
+    async def _listen(self) -> None:
+        reconnect = self._pubsub is None
+        while True:
+            try:
+                if reconnect:
+                    # 현재 구독 중인 채널을 다시 SUBSCRIBE, 끊긴 동안의 이벤트는 resync로 알림
+                    self._pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+                    if self._subscribers:
+                        await self._pubsub.subscribe(*(self.channel(user_id) for user_id in self._subscribers))
+                    for user_id in list(self._subscribers):
+                        self._deliver(user_id, [resync_event(user_id)])
+                    reconnect = False
+                # 구독 중인 채널이 없으면 listen()이 끝남 -> 다음 구독시 다시 시작
+                async for message in self._pubsub.listen():
+                    if message["type"] == "message":
+                        user_id = int(message["channel"].split(":")[1])
+                        self._deliver(user_id, events_adapter.validate_json(message["data"]))
+                return
+            except redis.RedisError:
+                logger.warning("todo event subscription lost, reconnecting", exc_info=True)
+                reconnect = True
+                await asyncio.sleep(1)
+
+    async def close(self) -> None:
+        await super().close()
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            self._pubsub = None
+
+
+# app lifespan에서 settings로 생성/종료 (main.py)
+broker: InProcessBroker | None = None
+
+
+def init_broker(settings: Settings) -> InProcessBroker:
+    global broker
+    broker_class = RedisBroker if settings.todo_events_broker == "redis" else InProcessBroker
+    broker = broker_class(queue_size=settings.todo_events_queue_size)
+    return broker
+
+
+def get_broker(settings: Settings = settings) -> InProcessBroker:
+    # lifespan 밖(스크립트, 테스트)에서 호출되어도 동작하도록 lazy init
+    return broker or init_broker(settings)
+
+
+async def close_broker() -> None:
+    global broker
+    if broker is not None:
+        await broker.close()
+        broker = None
+
+
+@on_todo_change
+async def invalidate_cache(events: List[ToDoEvent]) -> None:
+    # 캐시 버전(ETag) 증가, 캐시를 꺼도 항상 실행
+    # namespace별로 반영된 가장 큰 seq를 함께 기록 -> replica가 이 seq까지 복제되었는지로 replica 조회 여부 결정
+    seqs: dict[str, int] = {}
+    for event in events:
+        namespaces = [todo_cache.todo_namespace(event["id"])]
+        if event["user_id"] is not None:
+            namespaces.append(todo_cache.user_namespace(event["user_id"]))
+        for namespace in namespaces:
+            seqs[namespace] = max(seqs.get(namespace, 0), event["seq"] or 0)
+    await todo_cache.invalidate(dict(sorted(seqs.items())))
+
+
+@on_todo_change
+async def publish_events(events: List[ToDoEvent]) -> None:
+    # 캐시 무효화 이후에 전송 -> 이벤트를 받고 다시 조회한 클라이언트가 이전 캐시를 받지 않음
+    by_user: dict[int, List[ToDoEvent]] = {}
+    for event in events:
+        if event["user_id"] is not None:
+            by_user.setdefault(event["user_id"], []).append(event)
+    broker = get_broker()
+    for user_id, user_events in by_user.items():
+        await broker.publish(user_id, user_events)